@@ -18,12 +18,115 @@ secret key and running behind a proper WSGI server.
 
 from __future__ import annotations
 
+import csv
+import io
+import itertools
 import os
-from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file
+import random
+import uuid
+from operator import itemgetter
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    session,
+    flash,
+    send_file,
+    stream_with_context,
+)
 
 from .database import Database
 from .importer import Importer
-from .quiz import Quiz, Question
+from .quiz import Quiz, Question, normalize_answer
+from .quiz_store import get_default_store
+
+# Spaced repetition progress is buffered in the quiz state and written in
+# batches of this many answers, and once more when the quiz ends (finished,
+# replaced by a new quiz or on logout). Only quiz state that expires without
+# being ended loses its unwritten updates, at most this many minus one.
+PROGRESS_FLUSH_EVERY = 5
+
+# During a spaced repetition quiz the allowed groups are re-queried every
+# this many answers (and after every wrong answer).
+ALLOWED_REFRESH_EVERY = 5
+
+# pandas is heavy to import and only needed for some uploads and exports,
+# so it is loaded on first use and kept in a module-level binding.
+_pd = None
+
+
+def _pandas():
+    """Return the pandas module, importing it on first use."""
+    global _pd
+    if _pd is None:
+        import pandas as pd_module
+        _pd = pd_module
+    return _pd
+
+
+def read_upload(uploaded_file) -> Tuple[List[str], Iterator[Sequence[str]]]:
+    """Open an uploaded CSV or Excel file for streaming import.
+
+    The header row is read eagerly and used as the languages order. The
+    returned iterator yields the remaining rows as sequences of cell
+    strings, reading the file incrementally so that large uploads are
+    never fully materialised in memory.
+    """
+    filename = uploaded_file.filename.lower()
+    if filename.endswith(".xlsx"):
+        from openpyxl import load_workbook
+        workbook = load_workbook(uploaded_file.stream, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        languages_order = ["" if v is None else str(v) for v in header]
+
+        def xlsx_rows() -> Iterator[List[str]]:
+            try:
+                for row in rows:
+                    yield ["" if v is None else str(v) for v in row]
+            finally:
+                workbook.close()
+
+        return languages_order, xlsx_rows()
+    pd = _pandas()
+    if filename.endswith(".xls"):
+        # Legacy Excel files cannot be read incrementally
+        chunks = iter([pd.read_excel(uploaded_file.stream, dtype=str).fillna("")])
+    else:
+        # Assume CSV with comma delimiter
+        chunks = iter(pd.read_csv(
+            uploaded_file.stream, chunksize=10_000, dtype=str, keep_default_na=False
+        ))
+    first = next(chunks, None)
+    if first is None:
+        return [], iter(())
+    # Use header as languages order
+    languages_order = [str(c) for c in first.columns]
+
+    def frame_rows() -> Iterator[List[str]]:
+        for chunk in itertools.chain([first], chunks):
+            # Convert each chunk to Python lists in one vectorised call
+            # rather than building a tuple per row
+            yield from chunk.to_numpy(dtype=object).tolist()
+
+    return languages_order, frame_rows()
+
+
+def sample_distractors(
+    pool: dict, target_language: str, target_word: str, num_choices: int = 3
+) -> List[str]:
+    """Pick up to ``num_choices`` distinct wrong answers from a word pool.
+
+    ``pool`` maps language names to the distinct words of a set, as
+    returned by ``Database.get_all_words_by_lang``.
+    """
+    candidates = [w for w in pool.get(target_language, []) if w != target_word]
+    return random.sample(candidates, min(num_choices, len(candidates)))
 
 
 def create_app(db_path: str = "glosprogram.db") -> Flask:
@@ -37,6 +140,49 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
     db = Database(db_path)
     importer = Importer(db)
     quiz_logic = Quiz(db)
+    # Quiz state is kept server-side; the session cookie only holds its ID
+    quiz_store = get_default_store(db)
+
+    def load_quiz() -> Optional[dict]:
+        """Return the current user's in-progress quiz state, if any."""
+        quiz_id = session.get("quiz_id")
+        return quiz_store.get(f"quiz:{quiz_id}") if quiz_id else None
+
+    def save_quiz(quiz_state: dict) -> None:
+        quiz_store.set(f"quiz:{session['quiz_id']}", quiz_state)
+
+    def target_norm(question: dict) -> str:
+        # Questions saved before tgt_norm was introduced lack the key
+        return question.get("tgt_norm") or normalize_answer(question["tgt_word"])
+
+    def flush_progress(quiz_state: dict) -> None:
+        """Write buffered spaced repetition updates for the current user."""
+        pending = quiz_state.get("pending_progress")
+        uid = session.get("user_id")
+        if uid and pending:
+            db.update_user_progress_bulk(uid, [(gid, correct) for gid, correct in pending])
+        quiz_state["pending_progress"] = []
+
+    def end_quiz(flush: bool = True) -> None:
+        """Discard the current quiz, writing its buffered progress first.
+
+        Called when a quiz finishes, when a new one replaces it and on
+        logout, so answers to an abandoned quiz still update the schedule.
+
+        Args:
+            flush: Whether to write the stored quiz's buffered progress.
+                Pass False when the caller has already flushed the
+                in-memory state, since the stored copy still holds the
+                same entries and would apply them a second time.
+        """
+        quiz_id = session.pop("quiz_id", None)
+        if quiz_id:
+            if flush:
+                quiz_state = quiz_store.get(f"quiz:{quiz_id}")
+                if quiz_state:
+                    flush_progress(quiz_state)
+            quiz_store.delete(f"quiz:{quiz_id}")
+            quiz_store.delete(f"pool:{quiz_id}")
 
     # User management
     @app.before_request
@@ -56,16 +202,18 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
             if not username:
                 flash("Ange ett användarnamn.", "error")
                 return redirect(url_for("login"))
-            user_id = db.get_user_id(username.title())
+            name = username.title()
+            user_id = db.get_user_id(name)
             session["user_id"] = user_id
-            session["username"] = username.title()
-            flash(f"Inloggad som {username.title()}.", "success")
+            session["username"] = name
+            flash(f"Inloggad som {name}.", "success")
             return redirect(url_for("index"))
         users = db.list_users()
         return render_template("login.html", users=users)
 
     @app.route("/logout")
     def logout() -> str:
+        end_quiz()
         session.pop("user_id", None)
         session.pop("username", None)
         flash("Du är utloggad.", "success")
@@ -95,26 +243,25 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
                 else None
             )
             auto_spanish = request.form.get("auto_spanish") == "on"
-            # If a file is uploaded, parse its contents into text and language order
+            # If a file is uploaded, stream its rows straight into the importer
             if uploaded_file and uploaded_file.filename:
-                filename = uploaded_file.filename.lower()
-                content = uploaded_file.read()
+                # The file is parsed lazily while it is imported, so errors
+                # can surface at any point; the importer then removes the
+                # partially imported set.
                 try:
-                    from io import BytesIO
-                    import pandas as pd
-                    if filename.endswith(".xlsx") or filename.endswith(".xls"):
-                        df = pd.read_excel(BytesIO(content))
-                    else:
-                        # Assume CSV with comma delimiter
-                        df = pd.read_csv(BytesIO(content))
+                    languages_order, rows = read_upload(uploaded_file)
+                    set_id = importer.import_from_rows(
+                        set_name,
+                        rows,
+                        languages_order=languages_order,
+                        auto_translate_spanish=auto_spanish,
+                        tags=tags,
+                    )
                 except Exception as e:
                     flash(f"Kunde inte läsa filen: {e}", "error")
                     return redirect(url_for("import_view"))
-                # Use header as languages order
-                languages_order = list(df.columns)
-                # Build text string from dataframe values
-                rows = df.fillna("").astype(str).values.tolist()
-                text = "\n".join(["\t".join(row) for row in rows])
+                flash(f"Imported {set_name} (ID {set_id}).", "success")
+                return redirect(url_for("index"))
             if not text:
                 flash("Please paste or upload some vocabulary lines.", "error")
                 return redirect(url_for("import_view"))
@@ -142,8 +289,8 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
         parse the input and populate the selected set.
         """
         # Ensure set exists
-        sets = [s for s in db.fetch_sets() if s["id"] == set_id]
-        if not sets:
+        set_row = db.get_set(set_id)
+        if not set_row:
             flash("Set not found.", "error")
             return redirect(url_for("index"))
         if request.method == "POST":
@@ -170,14 +317,12 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
         else:
             # Provide list of languages for convenience
             languages = db.list_languages()
-            set_name = sets[0]["name"]
-            return render_template("add.html", set_id=set_id, set_name=set_name, languages=languages)
+            return render_template("add.html", set_id=set_id, set_name=set_row["name"], languages=languages)
 
     @app.route("/quiz/<int:set_id>", methods=["GET", "POST"])
     def quiz_start(set_id: int) -> str:
         # Ensure the set exists
-        sets = [s for s in db.fetch_sets() if s["id"] == set_id]
-        if not sets:
+        if not db.get_set(set_id):
             flash("Set not found.", "error")
             return redirect(url_for("index"))
         if request.method == "POST":
@@ -194,25 +339,13 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
             # Determine group restrictions based on spaced repetition or problematic words
             problem_only = request.form.get("problem_only") == "on"
             spaced = request.form.get("spaced_repetition") == "on"
-            allowed: Optional[list[int]] = None
             # Compute allowed group ids for spaced repetition and/or problematic words
-            if spaced:
-                uid = session.get("user_id")
-                if uid:
-                    due = db.get_due_groups(set_id, uid)
-                else:
-                    due = None
-                if problem_only:
-                    prob = db.get_problematic_groups(set_id)
-                    # intersection of due and problematic
-                    if due is not None:
-                        allowed = [gid for gid in due if gid in prob]
-                    else:
-                        allowed = prob
-                else:
-                    allowed = due
-            elif problem_only:
-                allowed = db.get_problematic_groups(set_id)
+            allowed = db.get_allowed_groups(
+                set_id,
+                session.get("user_id"),
+                spaced=spaced,
+                problem_only=problem_only,
+            )
             # Generate first question
             q = quiz_logic.generate_question(
                 set_id,
@@ -223,8 +356,10 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
             if not q:
                 flash("No valid questions available.", "error")
                 return redirect(url_for("index"))
-            # Store quiz state in session
-            session["quiz"] = {
+            # Store quiz state server-side, replacing any unfinished quiz
+            end_quiz()
+            session["quiz_id"] = uuid.uuid4().hex
+            quiz_state = {
                 "set_id": set_id,
                 "selected_langs": selected_langs,
                 "random_dir": random_dir,
@@ -235,24 +370,29 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
                 "score": 0,
                 "total": 0,
                 "answers": [],  # keep track of each answer for statistics
+                "pending_progress": [],  # spaced repetition updates not yet written
             }
             # Save current question including group id
-            session["current_question"] = {
+            quiz_state["current_question"] = {
                 "group_id": q.group_id,
                 "src_lang": q.source_language,
                 "src_word": q.source_word,
                 "tgt_lang": q.target_language,
                 "tgt_word": q.target_word,
+                # Normalised once here rather than on every comparison
+                "tgt_norm": normalize_answer(q.target_word),
                 "choices": None,  # will be populated for multiple-choice
             }
-            # For multiple-choice mode, pre-generate distractors
+            # For multiple-choice mode, fetch the distractor pool once per quiz
             if mode == "choice":
-                distractors = db.get_distractors(set_id, q.group_id, q.target_language, num_choices=3)
+                pool = db.get_all_words_by_lang(set_id)
+                quiz_store.set(f"pool:{session['quiz_id']}", pool)
+                distractors = sample_distractors(pool, q.target_language, q.target_word)
                 # include the correct answer and shuffle
                 options = distractors + [q.target_word]
-                import random
                 random.shuffle(options)
-                session["current_question"]["choices"] = options
+                quiz_state["current_question"]["choices"] = options
+            save_quiz(quiz_state)
             return redirect(url_for("quiz_question", set_id=set_id))
         else:
             languages = db.list_languages()
@@ -260,11 +400,11 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
 
     @app.route("/quiz/<int:set_id>/question", methods=["GET", "POST"])
     def quiz_question(set_id: int) -> str:
-        quiz_state = session.get("quiz")
+        quiz_state = load_quiz()
         if not quiz_state or quiz_state.get("set_id") != set_id:
             flash("Quiz session expired or invalid.", "error")
             return redirect(url_for("quiz_start", set_id=set_id))
-        current_q = session.get("current_question")
+        current_q = quiz_state.get("current_question")
         if request.method == "POST":
             # Store the current question for feedback before generating a new one
             previous_question = current_q.copy() if current_q else None
@@ -277,12 +417,12 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
             if mode == "typed":
                 user_input = request.form.get("answer", "").strip()
                 if current_q:
-                    correct = user_input.lower() == current_q["tgt_word"].lower()
+                    correct = normalize_answer(user_input) == target_norm(current_q)
             elif mode == "choice":
                 user_input = request.form.get("choice", "").strip()
                 if current_q:
                     # correct if selected choice matches the target word
-                    correct = user_input == current_q["tgt_word"]
+                    correct = normalize_answer(user_input) == target_norm(current_q)
             elif mode == "flashcard":
                 user_input = request.form.get("knew", "no")  # 'yes' if user knew it
                 if current_q:
@@ -295,32 +435,41 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
                     "to_lang": current_q.get("tgt_lang"),
                     "correct": correct,
                 })
-                # Update spaced repetition progress per user
-                uid = session.get("user_id")
-                if uid:
-                    db.update_user_progress(uid, current_q.get("group_id"), correct)
+                # Buffer spaced repetition progress; it is written in batches
+                pending = quiz_state.setdefault("pending_progress", [])
+                pending.append([current_q.get("group_id"), correct])
+                if len(pending) >= PROGRESS_FLUSH_EVERY:
+                    flush_progress(quiz_state)
             # Update counters
             quiz_state["total"] += 1
             if correct:
                 quiz_state["score"] += 1
-            # Update allowed groups if spaced repetition is active
+            # Update allowed groups if spaced repetition is active. Due dates
+            # barely move within a quiz, so the list is only re-queried
+            # periodically or after a wrong answer; in between, the group
+            # just answered is dropped locally since it is no longer due.
             if quiz_state.get("spaced"):
                 uid = session.get("user_id")
-                due_groups = db.get_due_groups(set_id, uid) if uid else None
-                allowed = None
-                if quiz_state.get("problem_only"):
-                    prob = db.get_problematic_groups(set_id)
-                    if due_groups is not None:
-                        allowed = [gid for gid in due_groups if gid in prob]
-                    else:
-                        allowed = prob
-                else:
-                    allowed = due_groups
+                allowed = quiz_state.get("allowed_groups")
+                if not correct or quiz_state["total"] % ALLOWED_REFRESH_EVERY == 0:
+                    allowed = db.get_allowed_groups(
+                        set_id,
+                        uid,
+                        spaced=True,
+                        problem_only=quiz_state.get("problem_only", False),
+                    )
+                    if allowed is not None and uid:
+                        # Answered groups are no longer due, even if their
+                        # progress has not been flushed to the database yet.
+                        unflushed = {gid for gid, _ in quiz_state.get("pending_progress", [])}
+                        allowed = [gid for gid in allowed if gid not in unflushed]
+                elif allowed is not None and uid and current_q:
+                    answered = current_q.get("group_id")
+                    allowed = [gid for gid in allowed if gid != answered]
                 # If empty list, treat as None (means no restriction)
                 if allowed is not None and len(allowed) == 0:
                     allowed = None
                 quiz_state["allowed_groups"] = allowed
-            session["quiz"] = quiz_state
             # Generate next question
             q = quiz_logic.generate_question(
                 set_id,
@@ -333,44 +482,53 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
                 score = quiz_state["score"]
                 total = quiz_state["total"]
                 user_id = session.get("user_id")
-                session_id = db.record_quiz_session(set_id, total, score, user_id)
-                for ans in quiz_state.get("answers", []):
-                    db.record_quiz_answer(
+                # Write progress, the session summary and all answers in
+                # one transaction
+                with db.transaction():
+                    flush_progress(quiz_state)
+                    session_id = db.record_quiz_session(set_id, total, score, user_id)
+                    db.record_quiz_answers_bulk(
                         session_id,
-                        ans.get("group_id"),
-                        ans.get("from_lang"),
-                        ans.get("to_lang"),
-                        ans.get("correct"),
+                        [
+                            (ans.get("group_id"), ans.get("from_lang"), ans.get("to_lang"), ans.get("correct"))
+                            for ans in quiz_state.get("answers", [])
+                        ],
                     )
-                session.pop("quiz", None)
-                session.pop("current_question", None)
+                # Progress was flushed above from the in-memory state
+                end_quiz(flush=False)
                 return render_template(
                     "quiz_result.html",
                     set_id=set_id,
                     score=score,
                     total=total,
                 )
-            # Save new question into session
-            session["current_question"] = {
+            # Save new question into the quiz state
+            quiz_state["current_question"] = {
                 "group_id": q.group_id,
                 "src_lang": q.source_language,
                 "src_word": q.source_word,
                 "tgt_lang": q.target_language,
                 "tgt_word": q.target_word,
+                # Normalised once here rather than on every comparison
+                "tgt_norm": normalize_answer(q.target_word),
                 "choices": None,
             }
-            # For multiple-choice mode, generate distractors
+            # For multiple-choice mode, draw distractors from the quiz's pool
             if quiz_state.get("mode") == "choice":
-                distractors = db.get_distractors(set_id, q.group_id, q.target_language, num_choices=3)
+                pool = quiz_store.get(f"pool:{session['quiz_id']}")
+                if pool is None:
+                    pool = db.get_all_words_by_lang(set_id)
+                    quiz_store.set(f"pool:{session['quiz_id']}", pool)
+                distractors = sample_distractors(pool, q.target_language, q.target_word)
                 options = distractors + [q.target_word]
-                import random
                 random.shuffle(options)
-                session["current_question"]["choices"] = options
+                quiz_state["current_question"]["choices"] = options
+            save_quiz(quiz_state)
             # Render next question page with feedback
             return render_template(
                 "quiz_question.html",
                 set_id=set_id,
-                question=session["current_question"],
+                question=quiz_state["current_question"],
                 feedback=correct,
                 previous_answer=user_input,
                 previous_question=previous_question,  # Pass the previous question data
@@ -412,12 +570,11 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
         stats_data = db.get_stats(set_id, since_days=days, user_id=uid)
         # Fetch problematic groups and their words
         prob_ids = db.get_problematic_groups(set_id, threshold=0.7, since_days=days, user_id=uid)
-        problem_words = []
-        for gid in prob_ids:
-            problem_words.append(db.fetch_group_words(gid))
+        words_by_group = db.fetch_groups_words_bulk(prob_ids)
+        problem_words = [words_by_group.get(gid, {}) for gid in prob_ids]
         # Determine set name for display
-        sets = [s for s in db.fetch_sets() if s["id"] == set_id]
-        set_name = sets[0]["name"] if sets else "Okänd"
+        set_row = db.get_set(set_id)
+        set_name = set_row["name"] if set_row else "Okänd"
         return render_template(
             "stats.html",
             set_id=set_id,
@@ -434,51 +591,63 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
         The default format is CSV. Specify ?format=excel to receive an
         Excel file (.xlsx). The exported file contains one row per
         translation group and one column per language present in the set.
-        Unknown languages are included as columns.
+        Unknown languages are included as columns. CSV output is streamed
+        row by row; only the Excel branch builds the file in memory.
         """
         fmt = request.args.get("format", "csv").lower()
-        # Gather all group words and determine language columns
-        group_ids = db.fetch_set_group_ids(set_id)
-        if not group_ids:
+        # Languages present in the set, sorted for column ordering
+        langs = db.fetch_set_languages(set_id)
+        if not langs:
             flash("Set saknar ord att exportera.", "error")
             return redirect(url_for("index"))
-        all_languages = set()
-        rows = []
-        for gid in group_ids:
-            words = db.fetch_group_words(gid)
-            all_languages.update(words.keys())
-            rows.append(words)
-        # Sort languages for column ordering
-        langs = sorted(all_languages)
-        # Build list of dicts with all languages present
-        data = []
-        for entry in rows:
-            row = {lang: entry.get(lang, "") for lang in langs}
-            data.append(row)
-        try:
-            import pandas as pd
-        except Exception as e:
-            flash(f"Pandas behövs för export: {e}", "error")
-            return redirect(url_for("index"))
-        df = pd.DataFrame(data)
-        from io import BytesIO
-        buffer = BytesIO()
+
+        def export_rows() -> Iterator[List[str]]:
+            # One query for all words; rows arrive ordered by group
+            for _, items in itertools.groupby(db.fetch_set_export_rows(set_id), key=itemgetter(0)):
+                words = {lang: word for _, lang, word in items}
+                yield [words.get(lang, "") for lang in langs]
+
         if fmt in {"excel", "xlsx", "xls"}:
             try:
-                df.to_excel(buffer, index=False)
+                from openpyxl import Workbook
+            except Exception as e:
+                flash(f"openpyxl behövs för export: {e}", "error")
+                return redirect(url_for("index"))
+            buffer = io.BytesIO()
+            try:
+                # Write-only workbooks stream rows to disk instead of
+                # keeping every cell in memory
+                workbook = Workbook(write_only=True)
+                sheet = workbook.create_sheet()
+                sheet.append(langs)
+                for row in export_rows():
+                    sheet.append(row)
+                workbook.save(buffer)
             except Exception as e:
                 flash(f"Kunde inte exportera till Excel: {e}", "error")
                 return redirect(url_for("index"))
             buffer.seek(0)
             filename = f"set_{set_id}.xlsx"
             mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        else:
-            # default to CSV
-            df.to_csv(buffer, index=False)
-            buffer.seek(0)
-            filename = f"set_{set_id}.csv"
-            mimetype = "text/csv"
-        return send_file(buffer, as_attachment=True, download_name=filename, mimetype=mimetype)
+            return send_file(buffer, as_attachment=True, download_name=filename, mimetype=mimetype)
+
+        def generate() -> Iterator[str]:
+            # default to CSV, written one row at a time
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(langs)
+            for row in export_rows():
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            yield buffer.getvalue()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=set_{set_id}.csv"},
+        )
 
     return app
 
@@ -486,5 +655,9 @@ def create_app(db_path: str = "glosprogram.db") -> Flask:
 if __name__ == "__main__":
     # Only executed when running `python -m glosprogram.app`
     app = create_app()
-    # Run with debug=True for live reload during development
-    app.run(debug=True)
\ No newline at end of file
+    if os.environ.get("FLASK_DEV"):
+        # Run with debug=True for live reload during development
+        app.run(debug=True)
+    else:
+        # Production deployments should use wsgi.py with gunicorn or waitress
+        app.run(threaded=True)
\ No newline at end of file
@@ -18,8 +18,103 @@ needs to be updated.
 
 from __future__ import annotations
 
+import json
+import random
 import sqlite3
-from typing import List, Optional, Dict, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict, Set, Tuple
+
+# Read-mostly catalog queries (sets, languages, users) are cached in process
+# for this many seconds. Writes made through a `Database` instance
+# invalidate its cache immediately; the TTL only bounds how long changes
+# made by other processes can go unnoticed.
+CATALOG_CACHE_TTL = 60.0
+# Sets and their contents are created by imports, which may run in another
+# worker process, so they are only cached briefly.
+SET_CACHE_TTL = 5.0
+
+# Connection settings applied on open. Write-ahead logging lets readers
+# proceed while a write is in progress, and together with
+# synchronous=NORMAL a commit no longer waits for an fsync. The remaining
+# settings keep temporary tables and a larger page cache in memory,
+# enforce the schema's foreign keys and make a connection wait up to five
+# seconds for a competing writer instead of failing with "database is
+# locked".
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Size of each connection's prepared statement cache. The default of 128
+# is close to the number of distinct statements this module issues.
+CACHED_STATEMENTS = 256
+
+# Languages (name, ISO code) that always exist in the database.
+DEFAULT_LANGUAGES = (
+    ("Swedish", "sv"),
+    ("English", "en"),
+    ("Spanish", "es"),
+)
+
+# Statements on the hot paths (imports and question generation). Keeping
+# them as constants guarantees that every call site issues the identical
+# string, so the prepared statement is reused from the cache.
+_SQL_SELECT_LANGUAGE_ID = "SELECT id FROM languages WHERE name = ?"
+_SQL_INSERT_LANGUAGE = "INSERT INTO languages (name, code) VALUES (?, ?)"
+_SQL_SELECT_TAG_ID = "SELECT id FROM tags WHERE name = ?"
+_SQL_SELECT_USER_ID = "SELECT id FROM users WHERE username = ?"
+_SQL_INSERT_GROUP = "INSERT INTO translation_groups DEFAULT VALUES"
+_SQL_INSERT_VOCAB_ITEM = """
+    INSERT OR IGNORE INTO vocab_items (group_id, language_id, word)
+    VALUES (?, ?, ?)
+"""
+_SQL_INSERT_SET_GROUP = "INSERT OR IGNORE INTO set_groups (set_id, group_id) VALUES (?, ?)"
+# Leitner update for one answer. New cards start in box 1 (correct) or 0;
+# existing cards move up a box (capped at 5) or back to 0. The card is due
+# again in 2**box days. SET expressions see the row's old box.
+_SQL_UPSERT_PROGRESS = """
+    INSERT INTO user_progress (user_id, group_id, box, due_date)
+    VALUES (
+        :user_id, :group_id, :correct,
+        datetime('now', printf('+%d days', 1 << :correct))
+    )
+    ON CONFLICT (user_id, group_id) DO UPDATE SET
+        box = CASE WHEN :correct THEN MIN(box + 1, 5) ELSE 0 END,
+        due_date = datetime(
+            'now', printf('+%d days', 1 << CASE WHEN :correct THEN MIN(box + 1, 5) ELSE 0 END)
+        )
+"""
+_SQL_CREATE_QUIZ_ANSWERS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL,
+        group_id INTEGER NOT NULL,
+        from_lang_id INTEGER NOT NULL,
+        to_lang_id INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        FOREIGN KEY (session_id) REFERENCES quiz_sessions(id) ON DELETE CASCADE,
+        FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE,
+        FOREIGN KEY (from_lang_id) REFERENCES languages(id),
+        FOREIGN KEY (to_lang_id) REFERENCES languages(id)
+    )
+"""
+_SQL_INSERT_QUIZ_ANSWER = """
+    INSERT INTO quiz_answers (session_id, group_id, from_lang_id, to_lang_id, correct)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_SELECT_GROUP_WORDS = """
+    SELECT l.name AS language, v.word
+    FROM vocab_items v
+    JOIN languages l ON v.language_id = l.id
+    WHERE v.group_id = ?
+"""
 
 
 class Database:
@@ -29,158 +124,457 @@ class Database:
 
     def __init__(self, db_path: str = "glosprogram.db") -> None:
         self.db_path = db_path
-        # Connect with isolation_level=None to enable autocommit. This
-        # simplifies transaction handling for a small application like this.
-        # check_same_thread=False allows the connection to be used from multiple threads
-        self.conn = sqlite3.connect(
+        # All writes go through a single writer connection, serialised by
+        # a lock. SQLite only allows one writer at a time anyway, and
+        # queueing on the lock is cheaper than waiting on busy_timeout.
+        self._writer = self._connect(check_same_thread=False)
+        self._write_lock = threading.RLock()
+        # Reads use a read-only connection per thread (see `conn`), so
+        # concurrent requests read in parallel with the writer.
+        self._local = threading.local()
+        # An in-memory database only exists within one connection, so the
+        # writer is shared with readers instead.
+        self._shared_conn: Optional[sqlite3.Connection] = None
+        if db_path == ":memory:":
+            self._shared_conn = self._writer
+        # Cache for catalog queries: key -> (monotonic expiry time, value)
+        self._catalog_cache: Dict[str, Tuple[float, Any]] = {}
+        # Keys invalidated inside the open transaction. They are dropped
+        # again after COMMIT, since other threads may have re-cached the
+        # pre-commit state in the meantime. Only touched under the write lock.
+        self._pending_invalidations: Set[str] = set()
+        # Bumped on every invalidation, so a value computed before it is
+        # not stored afterwards (see `_cached`).
+        self._cache_generation = 0
+        # Name -> ID lookups for languages, tags and users. Rows in these
+        # tables are never renamed or deleted, so entries never go stale;
+        # they are only dropped when a transaction that may have inserted
+        # them is rolled back.
+        self._language_ids: Dict[str, int] = {}
+        self._tag_ids: Dict[str, int] = {}
+        self._user_ids: Dict[str, int] = {}
+        # IDs of DEFAULT_LANGUAGES, resolved once at startup. These rows are
+        # committed before the instance is used, so they survive rollbacks.
+        self.default_language_ids: Dict[str, int] = {}
+        self._create_schema()
+        # Databases created before group_stats existed need a backfill
+        if self.conn.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM group_stats)"
+            " AND EXISTS (SELECT 1 FROM quiz_answers)"
+        ).fetchone()[0]:
+            self.rebuild_group_stats()
+        self._ensure_default_languages()
+        self.optimize()
+
+    def _connect(
+        self, check_same_thread: bool = True, read_only: bool = False
+    ) -> sqlite3.Connection:
+        """Open and configure a new connection to the database."""
+        # Connect with isolation_level=None to enable autocommit. Single
+        # statements commit on their own and batches are grouped explicitly
+        # with `transaction()`, rather than relying on the implicit
+        # deferred transactions of the sqlite3 module.
+        conn = sqlite3.connect(
             self.db_path,
             isolation_level=None,
-            check_same_thread=False
+            check_same_thread=check_same_thread,
+            cached_statements=CACHED_STATEMENTS,
         )
         # Return rows as dictionaries for convenience.
-        self.conn.row_factory = sqlite3.Row
-        self._create_schema()
-        self._ensure_default_languages()
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            # Guard against accidental writes outside the writer
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The connection the calling thread should read from.
+
+        This is the thread's own read-only connection, opened on first use
+        and kept for the lifetime of the thread, so worker threads of a WSGI
+        server reuse theirs across requests. With WAL enabled, readers see
+        a consistent snapshot while the writer commits. Inside `_writing()`
+        or `transaction()` the writer connection is returned instead, so
+        reads observe the transaction's own uncommitted changes.
+        """
+        if self._shared_conn is not None:
+            return self._shared_conn
+        if getattr(self._local, "writing", 0):
+            return self._writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _writing(self) -> Iterator[sqlite3.Cursor]:
+        """Hold the writer connection for the duration of the block.
+
+        Statements run in autocommit mode; use `transaction()` to group
+        several writes. Reentrant within a thread.
+
+        Yields:
+            A cursor on the writer connection.
+        """
+        with self._write_lock:
+            depth = getattr(self._local, "writing", 0)
+            self._local.writing = depth + 1
+            try:
+                yield self._writer.cursor()
+            finally:
+                self._local.writing = depth
+
+    def close(self) -> None:
+        """Close the calling thread's read connection, if it has one."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def _create_schema(self) -> None:
         """Create all tables if they do not already exist."""
-        cur = self.conn.cursor()
-        # Languages: unique name and optional code. Code isn't strictly
-        # enforced but helpful when interfacing with translation APIs.
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS languages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                code TEXT
+        # One transaction for all statements: a single commit, and a
+        # partially created schema is never left behind.
+        with self.transaction() as cur:
+            # Languages: unique name and optional code. Code isn't strictly
+            # enforced but helpful when interfacing with translation APIs.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS languages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    code TEXT
+                )
+                """
             )
-            """
-        )
-        # Translation groups: each group represents a concept across languages.
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS translation_groups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT
+            # Translation groups: each group represents a concept across languages.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translation_groups (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT
+                )
+                """
             )
-            """
-        )
-        # Vocabulary items: one entry per word in a specific language.
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS vocab_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                group_id INTEGER NOT NULL,
-                language_id INTEGER NOT NULL,
-                word TEXT NOT NULL,
-                import_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE (group_id, language_id),
-                FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE,
-                FOREIGN KEY (language_id) REFERENCES languages(id) ON DELETE CASCADE
+            # Vocabulary items: one entry per word in a specific language.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS vocab_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_id INTEGER NOT NULL,
+                    language_id INTEGER NOT NULL,
+                    word TEXT NOT NULL,
+                    import_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (group_id, language_id),
+                    FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE,
+                    FOREIGN KEY (language_id) REFERENCES languages(id) ON DELETE CASCADE
+                )
+                """
             )
-            """
-        )
-        # Sets / lessons table.
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                import_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            # Sets / lessons table.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    description TEXT,
+                    import_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
             )
-            """
-        )
-        # Relationship between sets and translation groups (many-to-many).
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS set_groups (
-                set_id INTEGER NOT NULL,
-                group_id INTEGER NOT NULL,
-                PRIMARY KEY (set_id, group_id),
-                FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
-                FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE
+            # Relationship between sets and translation groups (many-to-many).
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS set_groups (
+                    set_id INTEGER NOT NULL,
+                    group_id INTEGER NOT NULL,
+                    PRIMARY KEY (set_id, group_id),
+                    FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
+                    FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE
+                )
+                """
             )
-            """
-        )
 
-        # Tags for sets (many-to-many). Tags enable categorisation and filtering.
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS tags (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL
+            # Tags for sets (many-to-many). Tags enable categorisation and filtering.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tags (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL
+                )
+                """
             )
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS set_tags (
-                set_id INTEGER NOT NULL,
-                tag_id INTEGER NOT NULL,
-                PRIMARY KEY (set_id, tag_id),
-                FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
-                FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS set_tags (
+                    set_id INTEGER NOT NULL,
+                    tag_id INTEGER NOT NULL,
+                    PRIMARY KEY (set_id, tag_id),
+                    FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
+                    FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+                )
+                """
             )
-            """
-        )
 
-        # Users table for multi-user support
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL
+            # Users table for multi-user support
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL
+                )
+                """
             )
-            """
-        )
 
-        # Quiz sessions: summarises each quiz attempt.
-        # Include user_id in the CREATE TABLE statement
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                set_id INTEGER NOT NULL,
-                session_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                total_questions INTEGER NOT NULL,
-                correct_answers INTEGER NOT NULL,
-                user_id INTEGER,
-                FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            # Quiz sessions: summarises each quiz attempt.
+            # Include user_id in the CREATE TABLE statement
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quiz_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    set_id INTEGER NOT NULL,
+                    session_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    total_questions INTEGER NOT NULL,
+                    correct_answers INTEGER NOT NULL,
+                    user_id INTEGER,
+                    FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                )
+                """
             )
-            """
-        )
+            # Databases created before multi-user support lack user_id. Check
+            # the table definition rather than attempting the ALTER (and
+            # handling the error) on every start.
+            columns = {row["name"] for row in cur.execute("PRAGMA table_info(quiz_sessions)")}
+            if "user_id" not in columns:
+                cur.execute("ALTER TABLE quiz_sessions ADD COLUMN user_id INTEGER")
+
+            # Quiz answers: detailed log of each answer in a session.
+            cur.execute(_SQL_CREATE_QUIZ_ANSWERS.format(table="quiz_answers"))
+            columns = {row["name"] for row in cur.execute("PRAGMA table_info(quiz_answers)")}
+            if "from_lang" in columns:
+                self._migrate_quiz_answer_languages(cur)
+
+            # Table to track spaced repetition progress for each user and group.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS user_progress (
+                    user_id INTEGER NOT NULL,
+                    group_id INTEGER NOT NULL,
+                    box INTEGER DEFAULT 0,
+                    due_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, group_id),
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                    FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE
+                )
+                """
+            )
+
+            # Server-side state of in-progress quizzes (see quiz_store.py).
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quiz_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+            # Per (set, user, group) answer counts, maintained by the trigger
+            # below so that problematic words can be found without aggregating
+            # the whole answer history. Anonymous answers use user_id 0.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS group_stats (
+                    set_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL DEFAULT 0,
+                    group_id INTEGER NOT NULL,
+                    correct_count INTEGER NOT NULL DEFAULT 0,
+                    total_count INTEGER NOT NULL DEFAULT 0,
+                    last_session_time TIMESTAMP,
+                    PRIMARY KEY (set_id, user_id, group_id),
+                    FOREIGN KEY (set_id) REFERENCES sets(id) ON DELETE CASCADE,
+                    FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE
+                )
+                """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_quiz_answers_group_stats
+                AFTER INSERT ON quiz_answers
+                BEGIN
+                    INSERT INTO group_stats
+                        (set_id, user_id, group_id, correct_count, total_count, last_session_time)
+                    SELECT s.set_id, COALESCE(s.user_id, 0), NEW.group_id, NEW.correct, 1, s.session_time
+                    FROM quiz_sessions s
+                    WHERE s.id = NEW.session_id
+                    ON CONFLICT (set_id, user_id, group_id) DO UPDATE SET
+                        correct_count = correct_count + excluded.correct_count,
+                        total_count = total_count + 1,
+                        last_session_time = excluded.last_session_time;
+                END
+                """
+            )
+
+            # Indexes for the hot query paths. Lookups by set on set_groups are
+            # served by its primary key.
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_set_groups_group ON set_groups(group_id)"
+            )
+            # Covering indexes: fetching a group's words and checking whether a
+            # user's cards are due can be answered from the index alone,
+            # without visiting the table rows.
+            cur.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_vocab_items_group
+                ON vocab_items(group_id, language_id, word)
+                """
+            )
+            cur.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_user_progress_due
+                ON user_progress(user_id, group_id, due_date)
+                """
+            )
+            # Statistics and the problematic-word filter look up sessions by set
+            # (and user and time) and then aggregate their answers per group.
+            cur.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_quiz_sessions_set_user
+                ON quiz_sessions(set_id, user_id, session_time)
+                """
+            )
+            cur.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_quiz_answers_session
+                ON quiz_answers(session_id, group_id, correct)
+                """
+            )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_quiz_state_expires ON quiz_state(expires_at)"
+            )
+
+    def _migrate_quiz_answer_languages(self, cur: sqlite3.Cursor) -> None:
+        """Convert quiz_answers from language names to language IDs.
 
-        # Quiz answers: detailed log of each answer in a session.
+        Older databases stored the quiz direction as two TEXT columns.
+        SQLite cannot change column types in place, so the table is
+        rebuilt with integer language references and the rows copied over.
+        Must run inside the schema transaction.
+        """
+        # Answers may name languages that were never stored as such
         cur.execute(
             """
-            CREATE TABLE IF NOT EXISTS quiz_answers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER NOT NULL,
-                group_id INTEGER NOT NULL,
-                from_lang TEXT NOT NULL,
-                to_lang TEXT NOT NULL,
-                correct INTEGER NOT NULL,
-                FOREIGN KEY (session_id) REFERENCES quiz_sessions(id) ON DELETE CASCADE,
-                FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE
-            )
+            INSERT OR IGNORE INTO languages (name)
+            SELECT from_lang FROM quiz_answers UNION SELECT to_lang FROM quiz_answers
             """
         )
-
-        # Table to track spaced repetition progress for each user and group.
+        cur.execute(_SQL_CREATE_QUIZ_ANSWERS.format(table="quiz_answers_new"))
         cur.execute(
             """
-            CREATE TABLE IF NOT EXISTS user_progress (
-                user_id INTEGER NOT NULL,
-                group_id INTEGER NOT NULL,
-                box INTEGER DEFAULT 0,
-                due_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (user_id, group_id),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (group_id) REFERENCES translation_groups(id) ON DELETE CASCADE
-            )
+            INSERT INTO quiz_answers_new
+                (id, session_id, group_id, from_lang_id, to_lang_id, correct)
+            SELECT a.id, a.session_id, a.group_id, fl.id, tl.id, a.correct
+            FROM quiz_answers a
+            JOIN languages fl ON fl.name = a.from_lang
+            JOIN languages tl ON tl.name = a.to_lang
             """
         )
+        # Dropping the table also drops its indexes and triggers; they are
+        # recreated further down in _create_schema.
+        cur.execute("DROP TABLE quiz_answers")
+        cur.execute("ALTER TABLE quiz_answers_new RENAME TO quiz_answers")
+
+    def optimize(self) -> None:
+        """Refresh the query planner statistics after bulk changes.
+
+        ``PRAGMA optimize`` only re-analyses tables whose statistics are
+        likely to be stale, so it is cheap enough to run after every import.
+        """
+        with self._writing() as cur:
+            cur.execute("PRAGMA optimize")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Run a block of statements as a single transaction.
+
+        The connection otherwise runs in autocommit mode, so grouping
+        writes here saves a commit per statement. The transaction is
+        committed when the block completes and rolled back if it raises.
+        Nested uses join the outermost transaction. Other threads wait for
+        the writer until the transaction ends.
+
+        Yields:
+            A cursor on the writer connection.
+        """
+        with self._writing() as cur:
+            if self._writer.in_transaction:
+                yield cur
+                return
+            # Take the write lock up front. A deferred transaction that reads
+            # first and writes later can fail with SQLITE_BUSY when another
+            # connection commits in between, which busy_timeout cannot retry.
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                # Cached values may have been read from the rolled back state
+                self._pending_invalidations.clear()
+                self._clear_id_caches()
+                self._cache_generation += 1
+                self._catalog_cache.clear()
+                raise
+            cur.execute("COMMIT")
+            pending = self._pending_invalidations
+            self._pending_invalidations = set()
+            self._invalidate(*pending)
+
+    def _cached(
+        self, key: str, fn: Callable[[], Any], ttl: float = CATALOG_CACHE_TTL
+    ) -> Any:
+        """Return a cached catalog value, recomputing it once it is stale."""
+        now = time.monotonic()
+        entry = self._catalog_cache.get(key)
+        if entry is not None and now < entry[0]:
+            return entry[1]
+        generation = self._cache_generation
+        value = fn()
+        # Don't store a value that was invalidated while it was computed
+        if generation == self._cache_generation:
+            self._catalog_cache[key] = (now + ttl, value)
+        return value
+
+    def _peek(self, key: str) -> Any:
+        """Return a fresh cached catalog value, or None without computing it."""
+        entry = self._catalog_cache.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+
+    def _invalidate(self, *keys: str) -> None:
+        """Drop catalog cache entries after the underlying table changed.
+
+        Inside a transaction the keys are dropped now and again after
+        COMMIT, so values cached from the pre-commit state by other
+        threads do not outlive the change.
+        """
+        if getattr(self._local, "writing", 0) and self._writer.in_transaction:
+            self._pending_invalidations.update(keys)
+        self._cache_generation += 1
+        for key in keys:
+            self._catalog_cache.pop(key, None)
+
+    def _clear_id_caches(self) -> None:
+        """Forget cached language, tag and user IDs."""
+        self._language_ids.clear()
+        self._language_ids.update(self.default_language_ids)
+        self._tag_ids.clear()
+        self._user_ids.clear()
 
     def _ensure_default_languages(self) -> None:
         """Insert a few common languages on first run.
@@ -188,13 +582,12 @@ class Database:
         The application expects Swedish, English and Spanish to be present
         by default. Additional languages will be inserted on demand.
         """
-        default_langs = [
-            ("Swedish", "sv"),
-            ("English", "en"),
-            ("Spanish", "es"),
-        ]
-        for name, code in default_langs:
-            self.get_language_id(name, code)
+        # Warm the language ID cache with everything already stored
+        for row in self.conn.execute("SELECT id, name FROM languages"):
+            self._language_ids[row["name"]] = int(row["id"])
+        self.default_language_ids = {
+            name: self.get_language_id(name, code) for name, code in DEFAULT_LANGUAGES
+        }
 
     # Public API methods
     def get_language_id(self, name: str, code: Optional[str] = None) -> int:
@@ -209,39 +602,110 @@ class Database:
         Returns:
             The integer ID associated with the language.
         """
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT id FROM languages WHERE name = ?", (name,)
-        )
-        row = cur.fetchone()
+        lang_id = self._language_ids.get(name)
+        if lang_id is not None:
+            return lang_id
+        row = self.conn.execute(_SQL_SELECT_LANGUAGE_ID, (name,)).fetchone()
         if row:
-            return int(row["id"])
-        # Insert new language
-        cur.execute(
-            "INSERT INTO languages (name, code) VALUES (?, ?)", (name, code)
-        )
-        return int(cur.lastrowid)
+            lang_id = int(row["id"])
+        else:
+            with self.transaction() as cur:
+                # Another connection may have inserted it since the read above
+                row = cur.execute(_SQL_SELECT_LANGUAGE_ID, (name,)).fetchone()
+                if row:
+                    lang_id = int(row["id"])
+                else:
+                    # Insert new language
+                    cur.execute(_SQL_INSERT_LANGUAGE, (name, code))
+                    self._invalidate("languages", "language_codes")
+                    lang_id = int(cur.lastrowid)
+        self._language_ids[name] = lang_id
+        return lang_id
 
-    def list_languages(self) -> List[Dict[str, str]]:
-        """Return all languages sorted by name."""
-        cur = self.conn.cursor()
-        cur.execute("SELECT id, name, code FROM languages ORDER BY name")
-        return [dict(row) for row in cur.fetchall()]
+    def find_language_id(self, name: str) -> Optional[int]:
+        """Return the ID for a language, or None if it does not exist.
+
+        Unlike ``get_language_id`` this never inserts, so it is safe to use
+        for lookups driven by user input.
+        """
+        lang_id = self._language_ids.get(name)
+        if lang_id is not None:
+            return lang_id
+        row = self.conn.execute(_SQL_SELECT_LANGUAGE_ID, (name,)).fetchone()
+        if not row:
+            return None
+        lang_id = self._language_ids[name] = int(row["id"])
+        return lang_id
+
+    def list_languages(self) -> List[sqlite3.Row]:
+        """Return all languages sorted by name (cached).
+
+        Rows are returned as ``sqlite3.Row``, which supports access by
+        column name, rather than being copied into dicts.
+        """
+        def query() -> List[sqlite3.Row]:
+            cur = self.conn.cursor()
+            cur.execute("SELECT id, name, code FROM languages ORDER BY name")
+            return cur.fetchall()
+        return self._cached("languages", query)
+
+    def language_codes(self) -> Dict[str, Optional[str]]:
+        """Return a mapping from language name to ISO code (cached).
+
+        The mapping is shared by every caller of this database, so repeated
+        imports do not rebuild it.
+        """
+        def build() -> Dict[str, Optional[str]]:
+            return {row["name"]: row["code"] for row in self.list_languages()}
+        return self._cached("language_codes", build)
 
     def create_set(self, name: str, description: str = "") -> int:
         """Create a new set (lesson) and return its ID."""
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO sets (name, description) VALUES (?, ?)",
-            (name, description),
-        )
-        return int(cur.lastrowid)
+        with self._writing() as cur:
+            cur.execute(
+                "INSERT INTO sets (name, description) VALUES (?, ?)",
+                (name, description),
+            )
+            self._invalidate("sets", "sets_by_id")
+            return int(cur.lastrowid)
+
+    def delete_set(self, set_id: int) -> None:
+        """Delete a set and the translation groups that belong only to it.
+
+        Words, set associations, tags and quiz history of the set are
+        removed through ON DELETE CASCADE. Groups shared with other sets
+        are kept.
+        """
+        with self.transaction() as cur:
+            cur.execute(
+                """
+                DELETE FROM translation_groups
+                WHERE id IN (SELECT group_id FROM set_groups WHERE set_id = ?)
+                  AND id NOT IN (SELECT group_id FROM set_groups WHERE set_id <> ?)
+                """,
+                (set_id, set_id),
+            )
+            cur.execute("DELETE FROM sets WHERE id = ?", (set_id,))
+        self._invalidate("sets", "sets_by_id", f"set_groups:{set_id}")
 
     def add_group(self) -> int:
         """Create a new translation group and return its ID."""
-        cur = self.conn.cursor()
-        cur.execute("INSERT INTO translation_groups DEFAULT VALUES")
-        return int(cur.lastrowid)
+        with self._writing() as cur:
+            cur.execute(_SQL_INSERT_GROUP)
+            return int(cur.lastrowid)
+
+    def add_groups_bulk(self, count: int) -> List[int]:
+        """Create ``count`` translation groups in one transaction.
+
+        Returns:
+            The new group IDs, in creation order.
+        """
+        group_ids: List[int] = []
+        with self.transaction() as cur:
+            for _ in range(count):
+                cur.execute(_SQL_INSERT_GROUP)
+                group_ids.append(int(cur.lastrowid))
+        return group_ids
 
     def add_vocab_item(self, group_id: int, language: str, word: str) -> None:
         """Add a word in a particular language to a translation group.
@@ -256,60 +720,98 @@ class Database:
             word: The actual vocabulary item.
         """
         lang_id = self.get_language_id(language)
-        cur = self.conn.cursor()
-        # Ignore duplicates by using INSERT OR IGNORE.
-        cur.execute(
-            """
-            INSERT OR IGNORE INTO vocab_items (group_id, language_id, word)
-            VALUES (?, ?, ?)
-            """,
-            (group_id, lang_id, word),
-        )
+        with self._writing() as cur:
+            # Ignore duplicates by using INSERT OR IGNORE.
+            cur.execute(_SQL_INSERT_VOCAB_ITEM, (group_id, lang_id, word))
+
+    def add_vocab_items_bulk(self, items: List[Tuple[int, str, str]]) -> None:
+        """Add many words to translation groups in one transaction.
+
+        Equivalent to calling ``add_vocab_item`` for each entry, but the
+        rows are written with a single ``executemany`` and one commit.
+
+        Args:
+            items: Tuples of (group_id, language name, word).
+        """
+        if not items:
+            return
+        # Language IDs usually come straight from the in-process cache
+        rows = [
+            (group_id, self.get_language_id(language), word)
+            for group_id, language, word in items
+        ]
+        with self.transaction() as cur:
+            cur.executemany(_SQL_INSERT_VOCAB_ITEM, rows)
 
     def add_group_to_set(self, set_id: int, group_id: int) -> None:
         """Associate a translation group with a set."""
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT OR IGNORE INTO set_groups (set_id, group_id) VALUES (?, ?)",
-            (set_id, group_id),
-        )
+        with self._writing() as cur:
+            cur.execute(_SQL_INSERT_SET_GROUP, (set_id, group_id))
+        self._invalidate(f"set_groups:{set_id}")
+
+    def add_groups_to_set_bulk(self, set_id: int, group_ids: Iterable[int]) -> None:
+        """Associate many translation groups with a set in one statement."""
+        with self.transaction() as cur:
+            cur.executemany(_SQL_INSERT_SET_GROUP, [(set_id, g) for g in group_ids])
+        self._invalidate(f"set_groups:{set_id}")
 
     # Tag-related methods
     def get_tag_id(self, name: str) -> int:
         """Return the ID for a tag, inserting it if necessary."""
-        cur = self.conn.cursor()
-        cur.execute("SELECT id FROM tags WHERE name = ?", (name,))
-        row = cur.fetchone()
+        tag_id = self._tag_ids.get(name)
+        if tag_id is not None:
+            return tag_id
+        row = self.conn.execute(_SQL_SELECT_TAG_ID, (name,)).fetchone()
         if row:
-            return int(row["id"])
-        cur.execute("INSERT INTO tags (name) VALUES (?)", (name,))
-        return int(cur.lastrowid)
+            tag_id = int(row["id"])
+        else:
+            with self.transaction() as cur:
+                row = cur.execute(_SQL_SELECT_TAG_ID, (name,)).fetchone()
+                if row:
+                    tag_id = int(row["id"])
+                else:
+                    cur.execute("INSERT INTO tags (name) VALUES (?)", (name,))
+                    tag_id = int(cur.lastrowid)
+        self._tag_ids[name] = tag_id
+        return tag_id
 
     def add_tag_to_set(self, set_id: int, tag_name: str) -> None:
         """Associate a tag with a set."""
         tag_id = self.get_tag_id(tag_name)
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT OR IGNORE INTO set_tags (set_id, tag_id) VALUES (?, ?)",
-            (set_id, tag_id),
-        )
+        with self._writing() as cur:
+            cur.execute(
+                "INSERT OR IGNORE INTO set_tags (set_id, tag_id) VALUES (?, ?)",
+                (set_id, tag_id),
+            )
 
     # User-related methods
     def get_user_id(self, username: str) -> int:
         """Get or create a user by username."""
-        cur = self.conn.cursor()
-        cur.execute("SELECT id FROM users WHERE username = ?", (username,))
-        row = cur.fetchone()
+        user_id = self._user_ids.get(username)
+        if user_id is not None:
+            return user_id
+        row = self.conn.execute(_SQL_SELECT_USER_ID, (username,)).fetchone()
         if row:
-            return int(row["id"])
-        cur.execute("INSERT INTO users (username) VALUES (?)", (username,))
-        return int(cur.lastrowid)
+            user_id = int(row["id"])
+        else:
+            with self.transaction() as cur:
+                row = cur.execute(_SQL_SELECT_USER_ID, (username,)).fetchone()
+                if row:
+                    user_id = int(row["id"])
+                else:
+                    cur.execute("INSERT INTO users (username) VALUES (?)", (username,))
+                    self._invalidate("users")
+                    user_id = int(cur.lastrowid)
+        self._user_ids[username] = user_id
+        return user_id
 
-    def list_users(self) -> List[Dict[str, str]]:
-        """Return all users sorted by username."""
-        cur = self.conn.cursor()
-        cur.execute("SELECT id, username FROM users ORDER BY username")
-        return [dict(row) for row in cur.fetchall()]
+    def list_users(self) -> List[sqlite3.Row]:
+        """Return all users sorted by username (cached)."""
+        def query() -> List[sqlite3.Row]:
+            cur = self.conn.cursor()
+            cur.execute("SELECT id, username FROM users ORDER BY username")
+            return cur.fetchall()
+        return self._cached("users", query)
 
     # Quiz session logging
     def record_quiz_session(
@@ -327,24 +829,24 @@ class Database:
             correct: Number of correct answers.
             user_id: Optional ID of the user who took the quiz.
         """
-        cur = self.conn.cursor()
-        if user_id is not None:
-            cur.execute(
-                """
-                INSERT INTO quiz_sessions (set_id, total_questions, correct_answers, user_id)
-                VALUES (?, ?, ?, ?)
-                """,
-                (set_id, total, correct, user_id),
-            )
-        else:
-            cur.execute(
-                """
-                INSERT INTO quiz_sessions (set_id, total_questions, correct_answers)
-                VALUES (?, ?, ?)
-                """,
-                (set_id, total, correct),
-            )
-        return int(cur.lastrowid)
+        with self._writing() as cur:
+            if user_id is not None:
+                cur.execute(
+                    """
+                    INSERT INTO quiz_sessions (set_id, total_questions, correct_answers, user_id)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (set_id, total, correct, user_id),
+                )
+            else:
+                cur.execute(
+                    """
+                    INSERT INTO quiz_sessions (set_id, total_questions, correct_answers)
+                    VALUES (?, ?, ?)
+                    """,
+                    (set_id, total, correct),
+                )
+            return int(cur.lastrowid)
 
     def record_quiz_answer(
         self,
@@ -354,15 +856,80 @@ class Database:
         to_lang: str,
         correct: bool,
     ) -> None:
-        """Insert a detailed record for a single quiz answer."""
+        """Insert a detailed record for a single quiz answer.
+
+        The languages are given by name and stored as language IDs.
+        """
+        row = (
+            session_id,
+            group_id,
+            self.get_language_id(from_lang),
+            self.get_language_id(to_lang),
+            1 if correct else 0,
+        )
+        with self._writing() as cur:
+            cur.execute(_SQL_INSERT_QUIZ_ANSWER, row)
+
+    def record_quiz_answers_bulk(
+        self,
+        session_id: int,
+        answers: List[Tuple[int, str, str, bool]],
+    ) -> None:
+        """Insert detailed records for many quiz answers at once.
+
+        All rows are written with a single ``executemany`` inside one
+        transaction, so a finished quiz costs one commit regardless of how
+        many questions were answered.
+
+        Args:
+            session_id: The quiz session the answers belong to.
+            answers: Tuples of (group_id, from_lang, to_lang, correct).
+        """
+        if not answers:
+            return
+        # Language names are resolved through the in-process ID cache
+        rows = [
+            (
+                session_id,
+                group_id,
+                self.get_language_id(from_lang),
+                self.get_language_id(to_lang),
+                1 if correct else 0,
+            )
+            for group_id, from_lang, to_lang, correct in answers
+        ]
+        with self.transaction() as cur:
+            cur.executemany(_SQL_INSERT_QUIZ_ANSWER, rows)
+
+    # Server-side quiz state
+    def load_quiz_state(self, key: str) -> Optional[str]:
+        """Return the stored quiz state for a key, or None if missing or expired."""
         cur = self.conn.cursor()
         cur.execute(
-            """
-            INSERT INTO quiz_answers (session_id, group_id, from_lang, to_lang, correct)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (session_id, group_id, from_lang, to_lang, 1 if correct else 0),
+            "SELECT value FROM quiz_state WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
         )
+        row = cur.fetchone()
+        return row["value"] if row else None
+
+    def save_quiz_state(self, key: str, value: str, ttl: float) -> None:
+        """Store quiz state under a key, expiring ``ttl`` seconds from now."""
+        with self._writing() as cur:
+            cur.execute(
+                """
+                INSERT INTO quiz_state (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                """,
+                (key, value, time.time() + ttl),
+            )
+
+    def delete_quiz_state(self, key: str) -> None:
+        """Delete the quiz state for a key, along with any expired entries."""
+        with self._writing() as cur:
+            cur.execute(
+                "DELETE FROM quiz_state WHERE key = ? OR expires_at <= ?",
+                (key, time.time()),
+            )
 
     # Statistics and analytics
     def get_problematic_groups(
@@ -384,30 +951,61 @@ class Database:
             A list of group IDs.
         """
         cur = self.conn.cursor()
-        params = [set_id]
-        date_filter = ""
-        user_filter = ""
-        if since_days is not None:
-            date_filter = "AND s.session_time >= datetime('now', ? )"
-            params.append(f'-{since_days} day')
-        if user_id is not None:
-            user_filter = "AND s.user_id = ?"
-            params.append(user_id)
-        # Aggregate correctness by group
-        sql = f"""
-            SELECT a.group_id,
-                   SUM(a.correct) AS correct_count,
-                   COUNT(*) AS total_count
+        # Optional filters are NULL-tolerant predicates rather than spliced
+        # SQL, so each query text stays fixed and its plan is cached.
+        # The ratio test is "correct < threshold * total", which avoids a
+        # cast and a division per group.
+        params = {"set_id": set_id, "user_id": user_id, "threshold": float(threshold)}
+        if since_days is None:
+            # All-time figures come straight from the group_stats rollup
+            cur.execute(
+                """
+                SELECT group_id
+                FROM group_stats
+                WHERE set_id = :set_id AND (:user_id IS NULL OR user_id = :user_id)
+                GROUP BY group_id
+                HAVING SUM(correct_count) < :threshold * SUM(total_count)
+                """,
+                params,
+            )
+            return [int(row["group_id"]) for row in cur.fetchall()]
+        # A time window needs the per-answer history
+        params["since"] = f"-{int(since_days)} day"
+        cur.execute(
+            """
+            SELECT a.group_id
             FROM quiz_answers a
             JOIN quiz_sessions s ON a.session_id = s.id
-            WHERE s.set_id = ? {date_filter} {user_filter}
+            WHERE s.set_id = :set_id
+              AND s.session_time >= datetime('now', :since)
+              AND (:user_id IS NULL OR s.user_id = :user_id)
             GROUP BY a.group_id
-            HAVING (CAST(correct_count AS FLOAT) / total_count) < ?
-        """
-        params.append(threshold)
-        cur.execute(sql, params)
+            HAVING SUM(a.correct) < :threshold * COUNT(*)
+            """,
+            params,
+        )
         return [int(row["group_id"]) for row in cur.fetchall()]
 
+    def rebuild_group_stats(self) -> None:
+        """Recompute the group_stats rollup from the full answer history.
+
+        The rollup is kept up to date by a trigger on quiz_answers; this is
+        only needed to backfill it for existing data.
+        """
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM group_stats")
+            cur.execute(
+                """
+                INSERT INTO group_stats
+                    (set_id, user_id, group_id, correct_count, total_count, last_session_time)
+                SELECT s.set_id, COALESCE(s.user_id, 0), a.group_id,
+                       SUM(a.correct), COUNT(*), MAX(s.session_time)
+                FROM quiz_answers a
+                JOIN quiz_sessions s ON a.session_id = s.id
+                GROUP BY s.set_id, COALESCE(s.user_id, 0), a.group_id
+                """
+            )
+
     def get_stats(
         self, set_id: int, since_days: Optional[int] = None, user_id: Optional[int] = None
     ) -> Dict[str, float]:
@@ -421,24 +1019,18 @@ class Database:
             A dict containing total_sessions, avg_score, avg_correct_ratio.
         """
         cur = self.conn.cursor()
-        params = [set_id]
-        date_filter = ""
-        user_filter = ""
-        if since_days is not None:
-            date_filter = "AND session_time >= datetime('now', ? )"
-            params.append(f'-{since_days} day')
-        if user_id is not None:
-            user_filter = "AND user_id = ?"
-            params.append(user_id)
+        since = f"-{int(since_days)} day" if since_days is not None else None
         cur.execute(
-            f"""
+            """
             SELECT COUNT(*) AS session_count,
                    AVG(correct_answers) AS avg_correct,
                    AVG(CAST(correct_answers AS FLOAT) / total_questions) AS avg_ratio
             FROM quiz_sessions
-            WHERE set_id = ? {date_filter} {user_filter}
+            WHERE set_id = :set_id
+              AND (:since IS NULL OR session_time >= datetime('now', :since))
+              AND (:user_id IS NULL OR user_id = :user_id)
             """,
-            params,
+            {"set_id": set_id, "since": since, "user_id": user_id},
         )
         row = cur.fetchone()
         if not row or row["session_count"] is None:
@@ -465,35 +1057,37 @@ class Database:
             group_id: The translation group ID.
             correct: True if the user's answer was correct.
         """
-        import datetime
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT box FROM user_progress WHERE user_id = ? AND group_id = ?",
-            (user_id, group_id),
-        )
-        row = cur.fetchone()
-        # Determine new box
-        if row:
-            box = int(row["box"])
-            if correct:
-                box = min(box + 1, 5)
-            else:
-                box = 0
-            # Compute new due date based on box (2**box days)
-            interval_days = 2 ** box
-            due_date = datetime.datetime.now() + datetime.timedelta(days=interval_days)
+        with self._writing() as cur:
             cur.execute(
-                "UPDATE user_progress SET box = ?, due_date = ? WHERE user_id = ? AND group_id = ?",
-                (box, due_date, user_id, group_id),
+                _SQL_UPSERT_PROGRESS,
+                {"user_id": user_id, "group_id": group_id, "correct": int(bool(correct))},
             )
-        else:
-            # New record: start in box 0 or 1 depending on correctness
-            box = 1 if correct else 0
-            interval_days = 2 ** box
-            due_date = datetime.datetime.now() + datetime.timedelta(days=interval_days)
-            cur.execute(
-                "INSERT INTO user_progress (user_id, group_id, box, due_date) VALUES (?, ?, ?, ?)",
-                (user_id, group_id, box, due_date),
+
+    def update_user_progress_bulk(
+        self, user_id: int, updates: List[Tuple[int, bool]]
+    ) -> None:
+        """Apply many spaced repetition updates for a user in one transaction.
+
+        Equivalent to calling ``update_user_progress`` once per entry, in
+        order, but all upserts run through one ``executemany`` and commit
+        together.
+
+        Args:
+            user_id: The ID of the user.
+            updates: Tuples of (group_id, correct) in the order they were
+                answered. A group may appear more than once.
+        """
+        if not updates:
+            return
+        with self.transaction() as cur:
+            # Each upsert sees the box written by the previous one, so
+            # repeated answers for a group are applied in order.
+            cur.executemany(
+                _SQL_UPSERT_PROGRESS,
+                [
+                    {"user_id": user_id, "group_id": group_id, "correct": int(bool(correct))}
+                    for group_id, correct in updates
+                ],
             )
 
     def get_due_groups(self, set_id: int, user_id: int) -> List[int]:
@@ -511,6 +1105,7 @@ class Database:
             A list of group IDs ready for review.
         """
         cur = self.conn.cursor()
+        cur.row_factory = None
         # Select groups in the set where either no progress record exists or the due_date has passed
         cur.execute(
             """
@@ -523,8 +1118,80 @@ class Database:
             """,
             (user_id, set_id),
         )
+        return [row[0] for row in cur]
+
+    def get_allowed_groups(
+        self,
+        set_id: int,
+        user_id: Optional[int],
+        spaced: bool = False,
+        problem_only: bool = False,
+        threshold: float = 0.7,
+    ) -> Optional[List[int]]:
+        """Return the group IDs a quiz may draw from, or None for no restriction.
+
+        Combines the spaced repetition filter (see ``get_due_groups``) and
+        the problematic words filter (see ``get_problematic_groups``) into a
+        single query, intersecting them in SQL when both apply.
+
+        Args:
+            set_id: The lesson ID.
+            user_id: The current user. The spaced repetition filter is only
+                applied when a user is known.
+            spaced: Restrict to groups that are due for review.
+            problem_only: Restrict to groups answered correctly less often
+                than ``threshold``.
+            threshold: Correctness ratio below which a word is problematic.
+
+        Returns:
+            A list of group IDs, or None if neither filter applies.
+        """
+        use_due = bool(spaced and user_id)
+        if not use_due and not problem_only:
+            return None
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT sg.group_id
+            FROM set_groups sg
+            LEFT JOIN user_progress up
+              ON sg.group_id = up.group_id AND up.user_id = ?
+            WHERE sg.set_id = ?
+              AND (? = 0 OR up.due_date IS NULL OR up.due_date <= CURRENT_TIMESTAMP)
+              AND (? = 0 OR sg.group_id IN (
+                    SELECT gs.group_id
+                    FROM group_stats gs
+                    WHERE gs.set_id = ?
+                    GROUP BY gs.group_id
+                    HAVING SUM(gs.correct_count) < ? * SUM(gs.total_count)
+                  ))
+            """,
+            (user_id, set_id, int(use_due), int(bool(problem_only)), set_id, float(threshold)),
+        )
         return [int(row["group_id"]) for row in cur.fetchall()]
 
+    def get_all_words_by_lang(self, set_id: int) -> Dict[str, List[str]]:
+        """Return the distinct words of a set grouped by language name.
+
+        Used as the distractor pool for multiple-choice quizzes, so that it
+        can be fetched once per quiz rather than once per question.
+        """
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT DISTINCT l.name AS language, v.word
+            FROM set_groups sg
+            JOIN vocab_items v ON v.group_id = sg.group_id
+            JOIN languages l ON v.language_id = l.id
+            WHERE sg.set_id = ?
+            """,
+            (set_id,),
+        )
+        pool: Dict[str, List[str]] = {}
+        for row in cur.fetchall():
+            pool.setdefault(row["language"], []).append(row["word"])
+        return pool
+
     def get_distractors(
         self,
         set_id: int,
@@ -547,51 +1214,148 @@ class Database:
         Returns:
             A list of words (strings) to use as incorrect options.
         """
-        group_ids = self.fetch_set_group_ids(set_id)
-        # Remove the correct group from candidates
-        group_ids = [gid for gid in group_ids if gid != exclude_group_id]
-        import random
-        random.shuffle(group_ids)
-        distractors: List[str] = []
-        for gid in group_ids:
-            words = self.fetch_group_words(gid)
-            if target_language in words and words[target_language] not in distractors:
-                distractors.append(words[target_language])
-            if len(distractors) >= num_choices:
-                break
-        return distractors
+        lang_id = self.find_language_id(target_language)
+        if lang_id is None:
+            return []
+        # Let SQLite pick distinct random words from the other groups
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT v.word
+            FROM set_groups sg
+            JOIN vocab_items v ON v.group_id = sg.group_id AND v.language_id = ?
+            WHERE sg.set_id = ? AND sg.group_id <> ?
+              AND v.word NOT IN (
+                    SELECT word FROM vocab_items WHERE group_id = ? AND language_id = ?
+                  )
+            GROUP BY v.word
+            ORDER BY RANDOM()
+            LIMIT ?
+            """,
+            (lang_id, set_id, exclude_group_id, exclude_group_id, lang_id, num_choices),
+        )
+        return [row["word"] for row in cur.fetchall()]
 
     # Query methods
     def fetch_group_words(self, group_id: int) -> Dict[str, str]:
         """Return a mapping from language name to word for a group."""
-        cur = self.conn.cursor()
-        cur.execute(
+        cur = self.conn.execute(_SQL_SELECT_GROUP_WORDS, (group_id,))
+        return {row["language"]: row["word"] for row in cur.fetchall()}
+
+    def fetch_groups_words_bulk(self, group_ids: List[int]) -> Dict[int, Dict[str, str]]:
+        """Return ``fetch_group_words`` for many groups in a single query.
+
+        The IDs are bound as one JSON array rather than an IN list with a
+        placeholder per ID. That keeps the statement text identical for any
+        number of groups and avoids SQLite's limit on bound variables.
+
+        Args:
+            group_ids: The translation groups to fetch.
+
+        Returns:
+            A mapping from group ID to {language name: word}. Groups without
+            any words are absent.
+        """
+        result: Dict[int, Dict[str, str]] = {}
+        if not group_ids:
+            return result
+        cur = self.conn.execute(
             """
-            SELECT l.name AS language, v.word
+            SELECT v.group_id, l.name AS language, v.word
             FROM vocab_items v
             JOIN languages l ON v.language_id = l.id
-            WHERE v.group_id = ?
+            WHERE v.group_id IN (SELECT value FROM json_each(?))
             """,
-            (group_id,),
+            (json.dumps([int(g) for g in group_ids]),),
         )
-        return {row["language"]: row["word"] for row in cur.fetchall()}
+        for row in cur:
+            result.setdefault(int(row["group_id"]), {})[row["language"]] = row["word"]
+        return result
 
     def fetch_set_group_ids(self, set_id: int) -> List[int]:
-        """Return a list of translation group IDs belonging to a set."""
+        """Return the translation group IDs belonging to a set (cached).
+
+        The cache holds an immutable tuple; each caller gets its own list.
+        """
+        def query() -> Tuple[int, ...]:
+            cur = self.conn.cursor()
+            # Plain tuples are enough for a single column
+            cur.row_factory = None
+            cur.execute(
+                "SELECT group_id FROM set_groups WHERE set_id = ?",
+                (set_id,),
+            )
+            return tuple(row[0] for row in cur)
+        return list(self._cached(f"set_groups:{set_id}", query, SET_CACHE_TTL))
+
+    def fetch_set_languages(self, set_id: int) -> List[str]:
+        """Return the names of all languages used in a set, sorted by name."""
         cur = self.conn.cursor()
         cur.execute(
-            "SELECT group_id FROM set_groups WHERE set_id = ?",
+            """
+            SELECT DISTINCT l.name
+            FROM set_groups sg
+            JOIN vocab_items v ON v.group_id = sg.group_id
+            JOIN languages l ON v.language_id = l.id
+            WHERE sg.set_id = ?
+            ORDER BY l.name
+            """,
             (set_id,),
         )
-        return [int(row["group_id"]) for row in cur.fetchall()]
+        return [row["name"] for row in cur.fetchall()]
+
+    def fetch_set_export_rows(self, set_id: int) -> Iterator[Tuple[int, str, str]]:
+        """Yield (group_id, language, word) for every word in a set.
+
+        Rows are ordered by group ID so that callers can regroup them with
+        ``itertools.groupby``. Results are streamed from the cursor rather
+        than fetched into a list.
+        """
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT sg.group_id, l.name AS language, v.word
+            FROM set_groups sg
+            JOIN vocab_items v ON v.group_id = sg.group_id
+            JOIN languages l ON v.language_id = l.id
+            WHERE sg.set_id = ?
+            ORDER BY sg.group_id
+            """,
+            (set_id,),
+        )
+        for row in cur:
+            yield int(row["group_id"]), row["language"], row["word"]
+
+    def fetch_sets(self) -> List[sqlite3.Row]:
+        """Retrieve all sets, sorted by import date descending (cached)."""
+        def query() -> List[sqlite3.Row]:
+            cur = self.conn.cursor()
+            cur.execute(
+                "SELECT id, name, description, import_date FROM sets ORDER BY import_date DESC"
+            )
+            return cur.fetchall()
+        return self._cached("sets", query, SET_CACHE_TTL)
+
+    def get_set(self, set_id: int) -> Optional[sqlite3.Row]:
+        """Return a single set by ID, or None if it does not exist.
 
-    def fetch_sets(self) -> List[Dict[str, str]]:
-        """Retrieve all sets, sorted by import date descending."""
+        When the set list is already cached, the lookup goes through an ID
+        index built from it. Otherwise only the requested row is fetched by
+        primary key rather than loading every set.
+        """
+        index = self._peek("sets_by_id")
+        if index is None and self._peek("sets") is not None:
+            index = self._cached(
+                "sets_by_id", lambda: {s["id"]: s for s in self.fetch_sets()}, SET_CACHE_TTL
+            )
+        if index is not None:
+            return index.get(set_id)
         cur = self.conn.cursor()
         cur.execute(
-            "SELECT id, name, description, import_date FROM sets ORDER BY import_date DESC"
+            "SELECT id, name, description, import_date FROM sets WHERE id = ? LIMIT 1",
+            (set_id,),
         )
-        return [dict(row) for row in cur.fetchall()]
+        return cur.fetchone()
 
     def fetch_set_translations(
         self,
@@ -612,27 +1376,22 @@ class Database:
         Returns:
             A list of tuples (source_word, target_word).
         """
-        cur = self.conn.cursor()
-        # Fetch all group ids once up front to avoid nested queries.
-        group_ids = self.fetch_set_group_ids(set_id)
-        if not group_ids:
+        from_id = self.find_language_id(lang_from)
+        to_id = self.find_language_id(lang_to)
+        if from_id is None or to_id is None:
             return []
-        placeholders = ",".join(["?"] * len(group_ids))
-        # SQL to pivot two joins: one for each language. We join
-        # vocab_items twice on the same group_id to fetch the source and
-        # target words.
-        sql = f"""
-            SELECT s.word AS source_word, t.word AS target_word
-            FROM vocab_items s
-            JOIN vocab_items t ON s.group_id = t.group_id
-            JOIN languages sl ON s.language_id = sl.id
-            JOIN languages tl ON t.language_id = tl.id
-            WHERE s.group_id IN ({placeholders})
-              AND sl.name = ? AND tl.name = ?
-        """
+        cur = self.conn.cursor()
+        # Walk the set's groups and join vocab_items twice on the same
+        # group_id, once per language, to pivot the source and target words.
         cur.execute(
-            sql,
-            (*group_ids, lang_from, lang_to),
+            """
+            SELECT s.word AS source_word, t.word AS target_word
+            FROM set_groups sg
+            JOIN vocab_items s ON s.group_id = sg.group_id AND s.language_id = ?
+            JOIN vocab_items t ON t.group_id = sg.group_id AND t.language_id = ?
+            WHERE sg.set_id = ?
+            """,
+            (from_id, to_id, set_id),
         )
         return [(row["source_word"], row["target_word"]) for row in cur.fetchall()]
 
@@ -641,7 +1400,8 @@ class Database:
         set_id: int,
         languages: Optional[List[str]] = None,
         random_direction: bool = False,
-        allowed_group_ids: Optional[List[int]] = None,
+        allowed_group_ids: Optional[Iterable[int]] = None,
+        rng: Optional[random.Random] = None,
     ) -> Optional[Tuple[int, str, str, str, str]]:
         """Pick a random translation from the set.
 
@@ -651,45 +1411,172 @@ class Database:
                 If omitted, the method picks any available language pair.
             random_direction: If True, the direction (from->to) will be
                 chosen randomly between the two provided languages.
-            allowed_group_ids: Optional list of group IDs to restrict the pool.
+            allowed_group_ids: Optional group IDs (any iterable) to restrict the pool.
+            rng: Random generator for the direction choice. Defaults to the
+                module-level ``random`` functions.
 
         Returns:
             A tuple (group_id, source_language, source_word, target_language, target_word),
             or None if no valid translation exists.
         """
-        group_ids = self.fetch_set_group_ids(set_id)
-        if allowed_group_ids is not None:
-            group_ids = [gid for gid in group_ids if gid in allowed_group_ids]
-        if not group_ids:
+        if languages and len(languages) != 2:
+            raise ValueError("languages must be a list of exactly two names")
+        # The allowed groups are passed as a single JSON array parameter, so
+        # the statement stays the same whatever the number of groups. Any
+        # iterable of IDs is accepted, e.g. a set or a generator.
+        allowed = (
+            json.dumps([int(g) for g in allowed_group_ids])
+            if allowed_group_ids is not None
+            else None
+        )
+        cur = self.conn.cursor()
+        if languages:
+            lang1, lang2 = languages
+            id1 = self.find_language_id(lang1)
+            id2 = self.find_language_id(lang2)
+            if id1 is None or id2 is None:
+                return None
+            # Pick a random group that has words in both languages
+            cur.execute(
+                """
+                SELECT sg.group_id, s.word AS src_word, t.word AS tgt_word
+                FROM set_groups sg
+                JOIN vocab_items s ON s.group_id = sg.group_id AND s.language_id = ?
+                JOIN vocab_items t ON t.group_id = sg.group_id AND t.language_id = ?
+                WHERE sg.set_id = ?
+                  AND (? IS NULL OR sg.group_id IN (SELECT value FROM json_each(?)))
+                ORDER BY RANDOM()
+                LIMIT 1
+                """,
+                (id1, id2, set_id, allowed, allowed),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            group_id = int(row["group_id"])
+            if random_direction and (rng or random).random() < 0.5:
+                return (group_id, lang2, row["tgt_word"], lang1, row["src_word"])
+            return (group_id, lang1, row["src_word"], lang2, row["tgt_word"])
+        # Any language pair: pick a random group with at least two words,
+        # then a random ordered pair of its words. Choosing the group first
+        # keeps groups equally likely however many languages they have.
+        cur.execute(
+            """
+            WITH g AS (
+                SELECT sg.group_id
+                FROM set_groups sg
+                JOIN vocab_items v ON v.group_id = sg.group_id
+                WHERE sg.set_id = ?
+                  AND (? IS NULL OR sg.group_id IN (SELECT value FROM json_each(?)))
+                GROUP BY sg.group_id
+                HAVING COUNT(*) >= 2
+                ORDER BY RANDOM()
+                LIMIT 1
+            )
+            SELECT g.group_id, ls.name AS src_lang, s.word AS src_word,
+                   lt.name AS tgt_lang, t.word AS tgt_word
+            FROM g
+            JOIN vocab_items s ON s.group_id = g.group_id
+            JOIN vocab_items t ON t.group_id = g.group_id AND t.language_id <> s.language_id
+            JOIN languages ls ON ls.id = s.language_id
+            JOIN languages lt ON lt.id = t.language_id
+            ORDER BY RANDOM()
+            LIMIT 1
+            """,
+            (set_id, allowed, allowed),
+        )
+        row = cur.fetchone()
+        if row is None:
             return None
-        import random
-        random.shuffle(group_ids)
-        for group_id in group_ids:
-            words = self.fetch_group_words(group_id)
-            if not words:
-                continue
-            # Determine candidate language pairs
-            if languages:
-                if len(languages) != 2:
-                    raise ValueError("languages must be a list of exactly two names")
-                lang1, lang2 = languages
-                if lang1 not in words or lang2 not in words:
-                    continue
-                options = [(lang1, lang2)]
-            else:
-                langs = list(words.keys())
-                if len(langs) < 2:
-                    continue
-                options = []
-                for i in range(len(langs)):
-                    for j in range(len(langs)):
-                        if i != j:
-                            options.append((langs[i], langs[j]))
-            random.shuffle(options)
-            for (src, tgt) in options:
-                if src in words and tgt in words:
-                    if random_direction and languages:
-                        if random.choice([True, False]):
-                            src, tgt = tgt, src
-                    return (group_id, src, words[src], tgt, words[tgt])
-        return None
\ No newline at end of file
+        return (
+            int(row["group_id"]),
+            row["src_lang"],
+            row["src_word"],
+            row["tgt_lang"],
+            row["tgt_word"],
+        )
+
+    def fetch_random_groups(
+        self,
+        set_id: int,
+        k: int,
+        languages: Optional[List[str]] = None,
+        random_direction: bool = False,
+        allowed_group_ids: Optional[Iterable[int]] = None,
+        rng: Optional[random.Random] = None,
+    ) -> List[Tuple[int, str, str, str, str]]:
+        """Pick up to ``k`` distinct random translations from the set.
+
+        Batch counterpart of ``fetch_random_group_and_direction``. Instead
+        of one ``ORDER BY RANDOM()`` query per question, the candidates are
+        read once and sampled in Python.
+
+        Args:
+            set_id: Lesson ID to draw words from.
+            k: Number of translations to pick. Fewer are returned if the
+                set has fewer eligible groups.
+            languages: Optional list of exactly two languages to quiz between.
+                If omitted, each pick uses any available language pair.
+            random_direction: If True, the direction of each pick is chosen
+                randomly between the two provided languages.
+            allowed_group_ids: Optional group IDs (any iterable) to restrict the pool.
+            rng: Random generator used for sampling. Defaults to the
+                module-level ``random`` functions.
+
+        Returns:
+            A list of (group_id, source_language, source_word,
+            target_language, target_word) tuples, each from a different group.
+        """
+        if languages and len(languages) != 2:
+            raise ValueError("languages must be a list of exactly two names")
+        rand = rng or random
+        # Any iterable of IDs is accepted; read it once
+        allowed_ids = (
+            [int(g) for g in allowed_group_ids] if allowed_group_ids is not None else None
+        )
+        allowed = json.dumps(allowed_ids) if allowed_ids is not None else None
+        if languages:
+            lang1, lang2 = languages
+            id1 = self.find_language_id(lang1)
+            id2 = self.find_language_id(lang2)
+            if id1 is None or id2 is None:
+                return []
+            cur = self.conn.cursor()
+            cur.row_factory = None
+            cur.execute(
+                """
+                SELECT sg.group_id, s.word, t.word
+                FROM set_groups sg
+                JOIN vocab_items s ON s.group_id = sg.group_id AND s.language_id = ?
+                JOIN vocab_items t ON t.group_id = sg.group_id AND t.language_id = ?
+                WHERE sg.set_id = ?
+                  AND (? IS NULL OR sg.group_id IN (SELECT value FROM json_each(?)))
+                ORDER BY sg.group_id
+                """,
+                (id1, id2, set_id, allowed, allowed),
+            )
+            # A stable candidate order keeps seeded sampling reproducible
+            rows = cur.fetchall()
+            picks: List[Tuple[int, str, str, str, str]] = []
+            for group_id, src_word, tgt_word in rand.sample(rows, min(k, len(rows))):
+                if random_direction and rand.random() < 0.5:
+                    picks.append((group_id, lang2, tgt_word, lang1, src_word))
+                else:
+                    picks.append((group_id, lang1, src_word, lang2, tgt_word))
+            return picks
+        # Any language pair: sample among groups with at least two words
+        group_ids = self.fetch_set_group_ids(set_id)
+        if allowed_ids is not None:
+            allowed_set = set(allowed_ids)
+            group_ids = [g for g in group_ids if g in allowed_set]
+        words_by_group = self.fetch_groups_words_bulk(group_ids)
+        candidates = [
+            (g, words_by_group[g])
+            for g in group_ids
+            if len(words_by_group.get(g, ())) >= 2
+        ]
+        picks = []
+        for group_id, words in rand.sample(candidates, min(k, len(candidates))):
+            src, tgt = rand.sample(list(words), 2)
+            picks.append((group_id, src, words[src], tgt, words[tgt]))
+        return picks
@@ -18,12 +18,24 @@ the English term to Spanish.
 from __future__ import annotations
 
 import csv
+import itertools
+import mmap
+import os
 import re
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from .database import Database
 from .translator import BaseTranslator, get_default_translator
 
+# Fenced code blocks (```...```) are dropped from pasted text
+_CODE_FENCE_RE = re.compile(r"```.*?```", re.DOTALL)
+# Prefixes of Markdown table header separator rows such as "|:---|---:|",
+# checked after leading pipes and whitespace are removed
+_MD_SEP_PREFIXES = (":-", "-:", "---")
+
+# Number of rows written to the database per transaction during import
+IMPORT_BATCH_SIZE = 500
+
 
 class Importer:
     """Handles importing vocab lists into the database."""
@@ -63,30 +75,67 @@ class Importer:
         stripped.
         """
         # Remove code fences if present
-        clean = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
-        lines = [line.strip() for line in clean.strip().splitlines() if line.strip()]
-        if not lines:
-            return []
-        delim = self._detect_delimiter(lines[0])
-        rows: List[List[str]] = []
-        for line in lines:
-            if line.startswith("#"):
-                continue
-            # Skip markdown header separators
-            if re.match(r"\|?\s*:-", line):
-                continue
-            if delim == "|":
-                # Remove outer pipes and split
-                tokens = [cell.strip() for cell in line.strip("|").split("|")]
-            else:
-                tokens = [cell.strip() for cell in line.split(delim)]
-            # Filter out empty strings resulting from consecutive delimiters
-            tokens = [t for t in tokens if t]
+        clean = _CODE_FENCE_RE.sub("", text) if "```" in text else text
+        return list(self._iter_rows(clean.splitlines()))
+
+    def _iter_rows(
+        self, lines: Iterable[str], delimiter: Optional[str] = None
+    ) -> Iterator[List[str]]:
+        """Lazily parse lines into rows, one row at a time.
+
+        This is the streaming counterpart of ``_parse_lines`` and applies the
+        same filtering rules. If ``delimiter`` is omitted it is detected from
+        the first non-empty line.
+        """
+        nonempty = (line for line in (raw.strip() for raw in lines) if line)
+        first = next(nonempty, None)
+        if first is None:
+            return
+        delim = delimiter if delimiter is not None else self._detect_delimiter(first)
+        # Skip comments and markdown header separators
+        content = (
+            line
+            for line in itertools.chain([first], nonempty)
+            if not line.startswith("#")
+            and not line.lstrip("|").lstrip().startswith(_MD_SEP_PREFIXES)
+        )
+        if delim == "|":
+            # csv has no notion of Markdown tables, so pipes are split by hand
+            cell_rows: Iterable[List[str]] = (
+                (line[1:-1] if line[0] == "|" and line[-1] == "|" else line).split("|")
+                for line in content
+            )
+        else:
+            # Lines with quotes go through the csv module's C tokenizer, which
+            # honours quoted cells containing the delimiter. Each line is
+            # parsed on its own so a stray quote cannot swallow later lines.
+            cell_rows = (
+                next(csv.reader((line,), delimiter=delim, skipinitialspace=True))
+                if '"' in line
+                else line.split(delim)
+                for line in content
+            )
+        for cells in cell_rows:
+            # Strip cells and drop empty ones (consecutive delimiters or
+            # outer pipes) in a single pass
+            tokens = [t for t in (cell.strip() for cell in cells) if t]
             if len(tokens) < 2:
                 # We need at least two columns to form a translation pair
                 continue
-            rows.append(tokens)
-        return rows
+            yield tokens
+
+    def _iter_cell_rows(self, rows: Iterable[Sequence[str]]) -> Iterator[List[str]]:
+        """Lazily clean rows that are already split into cells.
+
+        Applies the same rules as ``_iter_rows``: cells are stripped, empty
+        cells are dropped, and comment rows or rows with fewer than two
+        cells are skipped.
+        """
+        for row in rows:
+            tokens = [t for t in (cell.strip() for cell in row) if t]
+            if len(tokens) < 2 or tokens[0].startswith("#"):
+                continue
+            yield tokens
 
     def import_from_string(
         self,
@@ -112,71 +161,291 @@ class Importer:
         Returns:
             The ID of the newly created set.
         """
+        # Remove code fences if present
+        clean = _CODE_FENCE_RE.sub("", text) if "```" in text else text
+        return self.import_from_iter(
+            set_name,
+            clean.splitlines(),
+            languages_order=languages_order,
+            auto_translate_spanish=auto_translate_spanish,
+            tags=tags,
+        )
+
+    def import_from_iter(
+        self,
+        set_name: str,
+        lines: Iterable[str],
+        languages_order: Optional[List[str]] = None,
+        auto_translate_spanish: bool = False,
+        tags: Optional[List[str]] = None,
+        delimiter: Optional[str] = None,
+    ) -> int:
+        """Import vocabulary from an iterable of lines.
+
+        Rows are parsed and inserted one at a time, so ``lines`` can be a
+        generator over a large file without the whole input being held in
+        memory. Otherwise this behaves like ``import_from_string``.
+
+        Args:
+            set_name: Name of the lesson to create.
+            lines: Lines of vocabulary, e.g. an open file or a generator.
+            languages_order: See ``import_from_string``.
+            auto_translate_spanish: See ``import_from_string``.
+            tags: Optional tag names to attach to the new set.
+            delimiter: Column delimiter. Detected from the first line if
+                omitted.
+
+        Returns:
+            The ID of the newly created set.
+        """
+        return self._import_rows(
+            set_name,
+            self._iter_rows(lines, delimiter),
+            languages_order=languages_order,
+            auto_translate_spanish=auto_translate_spanish,
+            tags=tags,
+        )
+
+    def import_from_path(
+        self,
+        set_name: str,
+        path: str,
+        languages_order: Optional[List[str]] = None,
+        auto_translate_spanish: bool = False,
+        tags: Optional[List[str]] = None,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+    ) -> int:
+        """Import vocabulary from a text file on disk.
+
+        The file is memory-mapped and read one line at a time, so its
+        contents are never copied into memory as a whole and arbitrarily
+        large files can be imported. Lines inside fenced code blocks are
+        skipped, like ``import_from_string`` does.
+
+        Args:
+            set_name: Name of the lesson to create.
+            path: Path of the file to import.
+            languages_order: See ``import_from_string``.
+            auto_translate_spanish: See ``import_from_string``.
+            tags: Optional tag names to attach to the new set.
+            delimiter: Column delimiter. Detected from the first line if
+                omitted.
+            encoding: Text encoding of the file.
+
+        Returns:
+            The ID of the newly created set.
+        """
+        with open(path, "rb") as f:
+            # Empty files cannot be memory-mapped
+            mm = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if os.fstat(f.fileno()).st_size
+                else None
+            )
+            try:
+                raw_lines = iter(mm.readline, b"") if mm is not None else iter(())
+                lines = (raw.decode(encoding, errors="replace") for raw in raw_lines)
+                return self.import_from_iter(
+                    set_name,
+                    _skip_code_fences(lines),
+                    languages_order=languages_order,
+                    auto_translate_spanish=auto_translate_spanish,
+                    tags=tags,
+                    delimiter=delimiter,
+                )
+            finally:
+                if mm is not None:
+                    mm.close()
+
+    def import_from_rows(
+        self,
+        set_name: str,
+        rows: Iterable[Sequence[str]],
+        languages_order: Optional[List[str]] = None,
+        auto_translate_spanish: bool = False,
+        tags: Optional[List[str]] = None,
+    ) -> int:
+        """Import vocabulary from rows that are already split into cells.
+
+        Intended for spreadsheet-like sources (CSV or Excel uploads), which
+        would otherwise have to be joined into text only to be split again.
+        Rows are consumed lazily, one at a time.
+
+        Args:
+            set_name: Name of the lesson to create.
+            rows: Sequences of cell strings, one per row.
+            languages_order: See ``import_from_string``.
+            auto_translate_spanish: See ``import_from_string``.
+            tags: Optional tag names to attach to the new set.
+
+        Returns:
+            The ID of the newly created set.
+        """
+        return self._import_rows(
+            set_name,
+            self._iter_cell_rows(rows),
+            languages_order=languages_order,
+            auto_translate_spanish=auto_translate_spanish,
+            tags=tags,
+        )
+
+    def _import_rows(
+        self,
+        set_name: str,
+        rows: Iterator[List[str]],
+        languages_order: Optional[List[str]] = None,
+        auto_translate_spanish: bool = False,
+        tags: Optional[List[str]] = None,
+    ) -> int:
+        """Create a new set and insert already parsed rows into it.
+
+        Rows are written in batches as they are read. If reading or writing
+        fails part way, the new set and the batches already written are
+        deleted again before the error is re-raised.
+        """
         # Create a new set
         set_id = self.db.create_set(set_name)
-        # Associate tags if provided
-        if tags:
-            for tag in tags:
-                self.db.add_tag_to_set(set_id, tag.strip().title())
-        rows = self._parse_lines(text)
-        if not rows:
-            return set_id
-        # Determine languages for columns. We use a single language order for
-        # all rows. If the caller provided `languages_order` matching the
-        # number of columns, we trust it. Otherwise we construct a default
-        # order: the first column is treated as an unknown source language,
-        # the second column is treated as the main (target) language, and
-        # any additional columns are labelled Unknown3, Unknown4 etc. Using
-        # unknown language names allows the database to insert new language
-        # entries automatically, preserving all information for later
-        # correction.
-        if languages_order and len(languages_order) == len(rows[0]):
+        try:
+            # Associate tags if provided
+            if tags:
+                for tag in tags:
+                    self.db.add_tag_to_set(set_id, tag.strip().title())
+            self._write_rows(set_id, rows, languages_order, auto_translate_spanish)
+        except BaseException:
+            # Don't leave a half-imported set behind
+            self.db.delete_set(set_id)
+            raise
+        return set_id
+
+    def _prepare_languages_order(
+        self, num_cols: int, languages_order: Optional[List[str]] = None
+    ) -> List[str]:
+        """Return the language of each column for an import.
+
+        We use a single language order for all rows. If the caller provided
+        `languages_order` matching the number of columns, we trust it.
+        Otherwise we construct a default order: the first column is treated
+        as an unknown source language, the second column is treated as the
+        main (target) language, and any additional columns are labelled
+        Unknown3, Unknown4 etc. Using unknown language names allows the
+        database to insert new language entries automatically, preserving
+        all information for later correction.
+        """
+        if languages_order and len(languages_order) == num_cols:
             # Normalize capitalization
-            languages_order = [lang.strip().title() for lang in languages_order]
-        else:
-            num_cols = len(rows[0])
-            inferred: List[str] = []
-            for i in range(num_cols):
-                if i == 0:
-                    inferred.append("Unknown1")
-                elif i == 1:
-                    inferred.append(self.default_main_language)
-                else:
-                    inferred.append(f"Unknown{i+1}")
-            languages_order = inferred
-
-        # Iterate through all rows and insert into DB
+            return [lang.strip().title() for lang in languages_order]
+        inferred: List[str] = []
+        for i in range(num_cols):
+            if i == 0:
+                inferred.append("Unknown1")
+            elif i == 1:
+                inferred.append(self.default_main_language)
+            else:
+                inferred.append(f"Unknown{i+1}")
+        return inferred
+
+    def _write_rows(
+        self,
+        set_id: int,
+        rows: Iterator[List[str]],
+        languages_order: Optional[List[str]] = None,
+        auto_translate_spanish: bool = False,
+    ) -> None:
+        """Insert parsed rows into a set as translation groups, in batches.
+
+        The language order is resolved from the first row. Rows with a
+        different number of columns are skipped.
+        """
+        first = next(rows, None)
+        if first is None:
+            return
+        rows = itertools.chain([first], rows)
+        languages_order = self._prepare_languages_order(len(first), languages_order)
+        # The language codes are the same for every row, so look them up once
+        codes = self._spanish_codes(languages_order) if auto_translate_spanish else None
+        # Iterate through all rows and insert into DB in batches. The column
+        # count and languages are loop-invariant; two-column lists (by far
+        # the most common) are paired up without zip.
+        n_langs = len(languages_order)
+        langs = tuple(languages_order)
+        # Parsed rows always have at least two columns
+        lang0, lang1 = langs[:2]
+        batch: List[List[Tuple[str, str]]] = []
+        # Bind the per-row lookups to locals once; the batch list is reused
+        append = batch.append
+        write = self._write_groups
+        batch_size = IMPORT_BATCH_SIZE
         for cols in rows:
-            if len(cols) != len(languages_order):
+            if len(cols) != n_langs:
                 # Skip rows with unexpected number of columns
                 continue
-            group_id = self.db.add_group()
-            for word, lang in zip(cols, languages_order):
-                self.db.add_vocab_item(group_id, lang, word)
-            # Optionally add Spanish translation
-            if auto_translate_spanish:
-                try:
-                    # Determine source language to translate from: take the first provided language
-                    src_lang = languages_order[0]
-                    # Translate only if we don't already have a Spanish column
-                    if "Spanish" not in languages_order:
-                        src_code = None
-                        dest_code = None
-                        # Attempt to map language names to codes via the database
-                        lang_map = {lr["name"]: lr["code"] for lr in self.db.list_languages()}
-                        if src_lang in lang_map and lang_map[src_lang]:
-                            src_code = lang_map[src_lang]
-                        if "Spanish" in lang_map and lang_map["Spanish"]:
-                            dest_code = lang_map["Spanish"]
-                        if src_code and dest_code:
-                            translation = self.translator.translate(cols[0], src=src_code, dest=dest_code)
-                            if translation:
-                                self.db.add_vocab_item(group_id, "Spanish", translation)
-                except Exception:
-                    pass
-            # Associate group with set
-            self.db.add_group_to_set(set_id, group_id)
-        return set_id
+            if n_langs == 2:
+                append([(lang0, cols[0]), (lang1, cols[1])])
+            else:
+                append(list(zip(langs, cols)))
+            if len(batch) >= batch_size:
+                write(set_id, batch, codes)
+                batch.clear()
+        write(set_id, batch, codes)
+        self.db.optimize()
+
+    def _spanish_codes(self, languages_order: List[str]) -> Optional[Tuple[str, str]]:
+        """Return the (source, Spanish) language codes for auto-translation.
+
+        The source is the first column's language. Returns None if the
+        import already has a Spanish column or either code is unknown, in
+        which case no translation is attempted.
+        """
+        # Translate only if we don't already have a Spanish column
+        if "Spanish" in languages_order:
+            return None
+        # Map language names to codes via the database's cached mapping
+        lang_map = self.db.language_codes()
+        src_code = lang_map.get(languages_order[0])
+        dest_code = lang_map.get("Spanish")
+        if src_code and dest_code:
+            return src_code, dest_code
+        return None
+
+    def _write_groups(
+        self,
+        set_id: int,
+        batch: List[List[Tuple[str, str]]],
+        codes: Optional[Tuple[str, str]] = None,
+    ) -> None:
+        """Insert a batch of translation groups into a set.
+
+        Each entry of ``batch`` holds the (language, word) pairs of one
+        group. The whole batch is written in a single transaction, so the
+        commit cost is paid once per batch rather than once per row.
+
+        If ``codes`` is given, the first word of every group is translated
+        to Spanish with one batched translator call before the write lock
+        is taken, and the translations are added to the groups.
+        """
+        if not batch:
+            return
+        if codes:
+            try:
+                translations = self.translator.translate_batch(
+                    [words[0][1] for words in batch], src=codes[0], dest=codes[1]
+                )
+            except Exception:
+                translations = []
+            for words, translation in zip(batch, translations):
+                if translation:
+                    words.append(("Spanish", translation))
+        with self.db.transaction():
+            group_ids = self.db.add_groups_bulk(len(batch))
+            self.db.add_vocab_items_bulk(
+                [
+                    (group_id, lang, word)
+                    for group_id, words in zip(group_ids, batch)
+                    for lang, word in words
+                ]
+            )
+            self.db.add_groups_to_set_bulk(set_id, group_ids)
 
     def import_into_set(
         self,
@@ -204,43 +473,20 @@ class Importer:
             None. The existing set will be updated in place.
         """
         rows = self._parse_lines(text)
-        if not rows:
-            return
-        # Determine languages order similarly to import_from_string
-        if languages_order and len(languages_order) == len(rows[0]):
-            languages_order = [lang.strip().title() for lang in languages_order]
-        else:
-            num_cols = len(rows[0])
-            inferred: List[str] = []
-            for i in range(num_cols):
-                if i == 0:
-                    inferred.append("Unknown1")
-                elif i == 1:
-                    inferred.append(self.default_main_language)
-                else:
-                    inferred.append(f"Unknown{i+1}")
-            languages_order = inferred
-        for cols in rows:
-            if len(cols) != len(languages_order):
-                continue
-            group_id = self.db.add_group()
-            for word, lang in zip(cols, languages_order):
-                self.db.add_vocab_item(group_id, lang, word)
-            if auto_translate_spanish:
-                try:
-                    src_lang = languages_order[0]
-                    if "Spanish" not in languages_order:
-                        src_code = None
-                        dest_code = None
-                        lang_map = {lr["name"]: lr["code"] for lr in self.db.list_languages()}
-                        if src_lang in lang_map and lang_map[src_lang]:
-                            src_code = lang_map[src_lang]
-                        if "Spanish" in lang_map and lang_map["Spanish"]:
-                            dest_code = lang_map["Spanish"]
-                        if src_code and dest_code:
-                            translation = self.translator.translate(cols[0], src=src_code, dest=dest_code)
-                            if translation:
-                                self.db.add_vocab_item(group_id, "Spanish", translation)
-                except Exception:
-                    pass
-            self.db.add_group_to_set(set_id, group_id)
\ No newline at end of file
+        self._write_rows(set_id, iter(rows), languages_order, auto_translate_spanish)
+
+
+def _skip_code_fences(lines: Iterable[str]) -> Iterator[str]:
+    """Drop fenced code blocks from a stream of lines.
+
+    Line-based counterpart of ``_CODE_FENCE_RE`` for streaming input: a
+    line starting with ``` opens or closes a fence, and the fence lines
+    themselves are dropped too.
+    """
+    in_fence = False
+    for line in lines:
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            continue
+        if not in_fence:
+            yield line
@@ -9,12 +9,23 @@ Python data structures, leaving presentation (UI) to the caller.
 from __future__ import annotations
 
 import random
-from dataclasses import dataclass
-from typing import Optional, Tuple, Dict, List
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Dict, Iterable, List
 
 from .database import Database
 
 
+def normalize_answer(text: str) -> str:
+    """Normalise an answer for comparison.
+
+    Applies Unicode NFKC normalisation, case folding and whitespace
+    stripping, so that answers differing only in case or in how accented
+    characters are encoded compare equal.
+    """
+    return unicodedata.normalize("NFKC", text).casefold().strip()
+
+
 @dataclass
 class Question:
     set_id: int
@@ -23,21 +34,30 @@ class Question:
     source_word: str
     target_language: str
     target_word: str
+    # The normalised target is the same for every attempt, so compute it once
+    _target_norm: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._target_norm = normalize_answer(self.target_word)
 
     def check_answer(self, answer: str) -> bool:
-        return answer.strip().lower() == self.target_word.strip().lower()
+        return normalize_answer(answer) == self._target_norm
 
 
 class Quiz:
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, seed: Optional[int] = None) -> None:
         self.db = db
+        # Private generator for sampling. A seed makes the questions chosen
+        # by generate_questions, and every direction flip, reproducible;
+        # generate_question still picks its group with SQL ORDER BY RANDOM().
+        self._rng = random.Random(seed)
 
     def generate_question(
         self,
         set_id: int,
         languages: Optional[List[str]] = None,
         random_direction: bool = False,
-        allowed_group_ids: Optional[List[int]] = None,
+        allowed_group_ids: Optional[Iterable[int]] = None,
     ) -> Optional[Question]:
         """Generate a single quiz question.
 
@@ -56,6 +76,7 @@ class Quiz:
             languages,
             random_direction,
             allowed_group_ids,
+            rng=self._rng,
         )
         if result is None:
             return None
@@ -69,6 +90,55 @@ class Quiz:
             target_word=tgt_word,
         )
 
+    def generate_questions(
+        self,
+        set_id: int,
+        num_questions: int,
+        languages: Optional[List[str]] = None,
+        random_direction: bool = False,
+        allowed_group_ids: Optional[Iterable[int]] = None,
+    ) -> List[Question]:
+        """Generate up to ``num_questions`` questions from distinct groups.
+
+        The questions are sampled from a single read of the set rather than
+        one random query per question. Fewer questions are returned if the
+        set has fewer eligible groups.
+
+        Args:
+            set_id: The lesson to draw from.
+            num_questions: Maximum number of questions to generate.
+            languages: Optional list specifying exactly two languages to quiz
+                between. If None, each question uses any available language
+                pair of its group.
+            random_direction: If True and languages is not None, randomly
+                swap the direction of each question.
+            allowed_group_ids: Optional group IDs to restrict the pool to.
+
+        Returns:
+            A list of at most ``num_questions`` `Question` instances, each
+            from a different group, in random order. Empty if no suitable
+            data is available.
+        """
+        picks = self.db.fetch_random_groups(
+            set_id,
+            num_questions,
+            languages,
+            random_direction,
+            allowed_group_ids,
+            rng=self._rng,
+        )
+        return [
+            Question(
+                set_id=set_id,
+                group_id=group_id,
+                source_language=src_lang,
+                source_word=src_word,
+                target_language=tgt_lang,
+                target_word=tgt_word,
+            )
+            for group_id, src_lang, src_word, tgt_lang, tgt_word in picks
+        ]
+
     def quiz_session(
         self,
         set_id: int,
@@ -92,10 +162,8 @@ class Quiz:
             `generate_question` directly.
         """
         results: List[Tuple[Question, bool]] = []
-        for _ in range(num_questions):
-            q = self.generate_question(set_id, languages, random_direction)
-            if q is None:
-                break
+        # Draw all questions up front, each from a different group
+        for q in self.generate_questions(set_id, num_questions, languages, random_direction):
             # For CLI demonstration, we prompt the user here. In a GUI
             # application you would instead render the question and collect
             # user input via forms.
@@ -0,0 +1,96 @@
+"""Server-side storage for in-progress quiz state.
+
+The state of a running quiz (answer log, allowed groups, current
+question) grows with every answered question. Keeping it in Flask's
+signed session cookie means it is serialised, signed and sent back and
+forth on every request, and long quizzes can exceed the 4KB cookie
+limit. Instead the state is stored on the server and the cookie only
+carries a random quiz ID.
+
+Redis is used when the `redis` package is installed and the
+`GLOSPROGRAM_REDIS_URL` environment variable is set. Otherwise the state
+is kept in the application's SQLite database, which works out of the box
+and is still shared between worker processes. Note that the whole state
+is rewritten after every answer, so with SQLite each answer costs one
+write transaction whose size grows with the quiz's answer log.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Optional
+
+from .database import Database
+
+try:
+    # Redis is optional; without it quiz state lives in SQLite.
+    import redis as _redis
+except Exception:
+    _redis = None  # type: ignore
+
+# Quiz state that has not been touched for this many seconds expires.
+QUIZ_STATE_TTL = 3600
+
+
+class BaseQuizStore:
+    """Abstract key/value store for JSON-serialisable quiz state."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class RedisQuizStore(BaseQuizStore):
+    """Quiz state store backed by Redis, with a TTL on every key."""
+
+    def __init__(self, client: Any, ttl: int = QUIZ_STATE_TTL) -> None:
+        self._client = client
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+class DatabaseQuizStore(BaseQuizStore):
+    """Quiz state store backed by the application's SQLite database."""
+
+    def __init__(self, db: Database, ttl: int = QUIZ_STATE_TTL) -> None:
+        self.db = db
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.db.load_quiz_state(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self.db.save_quiz_state(key, json.dumps(value), self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.db.delete_quiz_state(key)
+
+
+def get_default_store(db: Database) -> BaseQuizStore:
+    """Return a Redis store if configured and reachable, else SQLite."""
+    url = os.environ.get("GLOSPROGRAM_REDIS_URL")
+    if url and _redis is not None:
+        try:
+            client = _redis.Redis.from_url(url)
+            # from_url() does not connect, so check the server answers
+            client.ping()
+            return RedisQuizStore(client)
+        except Exception:
+            pass
+    return DatabaseQuizStore(db)
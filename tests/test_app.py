@@ -0,0 +1,108 @@
+"""Tests for the Flask views."""
+
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+from ..app import create_app
+from ..quiz import Quiz
+
+
+class QuizProgressTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = create_app(os.path.join(self.tmpdir, "test.db"))
+        self.app.testing = True
+        self.client = self.app.test_client()
+        self.client.post("/login", data={"username": "tester"})
+        words = "\n".join(f"word{i}\tord{i}" for i in range(20))
+        self.client.post(
+            "/import",
+            data={"set_name": "Lesson", "vocab_text": words, "languages_order": "English,Swedish"},
+        )
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def start_quiz(self) -> None:
+        self.client.post("/quiz/1", data={"languages": ["English", "Swedish"], "mode": "flashcard"})
+        self.client.get("/quiz/1/question")
+
+    def query(self, sql: str) -> list:
+        conn = sqlite3.connect(os.path.join(self.tmpdir, "test.db"))
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def boxes(self) -> dict:
+        return dict(self.query("SELECT group_id, box FROM user_progress"))
+
+    def answer(self, times: int) -> None:
+        for _ in range(times):
+            self.client.post("/quiz/1/question", data={"knew": "yes"})
+
+    def test_buffered_progress_is_written_when_a_new_quiz_starts(self) -> None:
+        self.start_quiz()
+        self.answer(4)
+        self.start_quiz()
+        # Fewer answers than PROGRESS_FLUSH_EVERY, so all were still
+        # buffered; each correct answer moves its group up one box
+        self.assertEqual(sum(self.boxes().values()), 4)
+
+    def test_buffered_progress_is_written_on_logout(self) -> None:
+        self.start_quiz()
+        self.answer(3)
+        self.client.get("/logout")
+        self.assertEqual(sum(self.boxes().values()), 3)
+
+    def test_finished_quiz_writes_progress_once(self) -> None:
+        self.start_quiz()
+        self.answer(2)
+        with mock.patch.object(Quiz, "generate_question", return_value=None):
+            response = self.client.post("/quiz/1/question", data={"knew": "yes"})
+        self.assertEqual(response.status_code, 200)
+        answered = Counter(gid for (gid,) in self.query("SELECT group_id FROM quiz_answers"))
+        self.assertEqual(sum(answered.values()), 3)
+        self.assertEqual(self.boxes(), dict(answered))
+
+
+class UploadTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "test.db")
+        self.app = create_app(self.db_path)
+        self.app.testing = True
+        self.client = self.app.test_client()
+        self.client.post("/login", data={"username": "tester"})
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def count(self, table: str) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_csv_error_after_first_chunk_leaves_nothing_behind(self) -> None:
+        # The bad line is in the second 10000-row chunk read by pandas
+        lines = ["English,Swedish"] + [f"word{i},ord{i}" for i in range(12000)]
+        lines[11000] = "too,many,fields"
+        data = {"set_name": "Big", "file": (io.BytesIO("\n".join(lines).encode()), "big.csv")}
+        response = self.client.post("/import", data=data, content_type="multipart/form-data")
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.location.endswith("/import"))
+        self.assertEqual(self.count("sets"), 0)
+        self.assertEqual(self.count("translation_groups"), 0)
+        self.assertEqual(self.count("vocab_items"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
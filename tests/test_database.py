@@ -0,0 +1,100 @@
+"""Tests for the Database catalog caches."""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from ..database import Database
+
+
+class CatalogCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # A file database, so other threads read through their own connection
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db = Database(self.path)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def read_in_thread(self, fn):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(fn()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_reader_during_transaction_does_not_keep_stale_languages(self) -> None:
+        self.db.language_codes()
+        with self.db.transaction():
+            self.db.get_language_id("Klingon")
+            # Another thread still sees, and caches, the pre-commit state
+            codes = self.read_in_thread(self.db.language_codes)
+            self.assertNotIn("Klingon", codes)
+        self.assertIn("Klingon", self.db.language_codes())
+        self.assertIn("Klingon", [row["name"] for row in self.db.list_languages()])
+
+    def test_reader_during_transaction_does_not_keep_stale_set_groups(self) -> None:
+        set_id = self.db.create_set("Lesson")
+        self.db.fetch_set_group_ids(set_id)
+        with self.db.transaction():
+            group_ids = self.db.add_groups_bulk(2)
+            self.db.add_groups_to_set_bulk(set_id, group_ids)
+            stale = self.read_in_thread(lambda: self.db.fetch_set_group_ids(set_id))
+            self.assertEqual(list(stale), [])
+        self.assertEqual(sorted(self.db.fetch_set_group_ids(set_id)), group_ids)
+
+    def test_rollback_drops_cached_values(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.get_language_id("Klingon")
+                self.db.language_codes()
+                raise RuntimeError
+        self.assertNotIn("Klingon", self.db.language_codes())
+
+
+class GroupIdTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = Database(":memory:")
+        self.set_id = self.db.create_set("Lesson")
+        for sv, en in (("hund", "dog"), ("katt", "cat")):
+            group_id = self.db.add_group()
+            self.db.add_vocab_items_bulk([(group_id, "Swedish", sv), (group_id, "English", en)])
+            self.db.add_group_to_set(self.set_id, group_id)
+        self.user_id = self.db.get_user_id("Tester")
+
+    def test_group_id_results_are_lists(self) -> None:
+        due = self.db.get_due_groups(self.set_id, self.user_id)
+        self.assertIsInstance(due, list)
+        self.assertEqual(sorted(due), [1, 2])
+        group_ids = self.db.fetch_set_group_ids(self.set_id)
+        self.assertIsInstance(group_ids, list)
+        # Callers get their own copy of the cached IDs
+        group_ids.append(99)
+        self.assertEqual(sorted(self.db.fetch_set_group_ids(self.set_id)), [1, 2])
+
+    def test_random_picks_accept_any_iterable_of_allowed_ids(self) -> None:
+        due = self.db.get_due_groups(self.set_id, self.user_id)
+        for allowed in (due, set(due), tuple(due), (g for g in [1])):
+            with self.subTest(allowed=type(allowed).__name__):
+                pick = self.db.fetch_random_group_and_direction(
+                    self.set_id, ["Swedish", "English"], allowed_group_ids=allowed
+                )
+                self.assertIn(pick[0], due)
+        for languages in (["Swedish", "English"], None):
+            picks = self.db.fetch_random_groups(
+                self.set_id, 5, languages, allowed_group_ids=(g for g in [2])
+            )
+            self.assertEqual([p[0] for p in picks], [2])
+        self.assertEqual(
+            self.db.fetch_random_group_and_direction(self.set_id, allowed_group_ids=set()),
+            None,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests for parsing pasted vocabulary lists."""
+
+import os
+import tempfile
+import unittest
+
+from ..database import Database
+from ..importer import Importer
+
+
+class TextImportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db = Database(self.path)
+        self.importer = Importer(self.db)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_markdown_separator_rows_are_skipped(self) -> None:
+        for separator in ("|:---|:---|", "| --- | --- |", ":---"):
+            with self.subTest(separator=separator):
+                text = f"| English | Swedish |\n{separator}\n| dog | hund |"
+                self.assertEqual(
+                    self.importer._parse_lines(text),
+                    [["English", "Swedish"], ["dog", "hund"]],
+                )
+
+    def test_words_starting_with_a_dash_are_kept(self) -> None:
+        text = "| English | Swedish |\n|:---|:---|\n| -ing | -ande |\n| -1 | minus ett |"
+        set_id = self.importer.import_from_string(
+            "Suffixes", text, languages_order=["English", "Swedish"]
+        )
+        words = self.db.get_all_words_by_lang(set_id)
+        self.assertIn("-ing", words["English"])
+        self.assertIn("-1", words["English"])
+        self.assertNotIn(":---", words["English"])
+
+    def test_quoted_cell_may_contain_the_delimiter(self) -> None:
+        self.assertEqual(
+            self.importer._parse_lines('a,"b, c"\nd,e'),
+            [["a", "b, c"], ["d", "e"]],
+        )
+
+    def test_stray_quote_does_not_swallow_later_lines(self) -> None:
+        self.assertEqual(
+            self.importer._parse_lines('a,"b\nc,d'),
+            [["a", "b"], ["c", "d"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests for choosing the quiz state store."""
+
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from .. import quiz_store
+from ..database import Database
+from ..quiz_store import DatabaseQuizStore, RedisQuizStore, get_default_store
+
+
+class _FakeRedisClient:
+    def __init__(self, reachable: bool) -> None:
+        self.reachable = reachable
+
+    def ping(self) -> bool:
+        if not self.reachable:
+            raise ConnectionError("Connection refused")
+        return True
+
+
+def _fake_redis(reachable: bool) -> types.ModuleType:
+    module = types.ModuleType("redis")
+    module.Redis = types.SimpleNamespace(from_url=lambda url: _FakeRedisClient(reachable))
+    return module
+
+
+class DefaultStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db = Database(self.path)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def default_store(self, reachable: bool):
+        env = {"GLOSPROGRAM_REDIS_URL": "redis://localhost:6379/0"}
+        with mock.patch.dict(os.environ, env), mock.patch.object(
+            quiz_store, "_redis", _fake_redis(reachable)
+        ):
+            return get_default_store(self.db)
+
+    def test_reachable_redis_is_used(self) -> None:
+        self.assertIsInstance(self.default_store(reachable=True), RedisQuizStore)
+
+    def test_unreachable_redis_falls_back_to_database(self) -> None:
+        self.assertIsInstance(self.default_store(reachable=False), DatabaseQuizStore)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for the googletrans wrapper."""
+
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+from .. import translator
+from ..translator import GoogleTranslator
+
+
+class _Result:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _FakeClient:
+    def translate(self, text, src, dest):
+        if isinstance(text, list):
+            return [_Result(t.upper()) for t in text]
+        return _Result(text.upper())
+
+
+class TranslationCacheTest(unittest.TestCase):
+    def make_translator(self) -> GoogleTranslator:
+        t = GoogleTranslator()
+        t._loaded = True
+        t._translator = _FakeClient()
+        return t
+
+    def test_cache_is_safe_under_concurrent_eviction(self) -> None:
+        t = self.make_translator()
+        errors = []
+
+        def work(offset: int) -> None:
+            try:
+                for i in range(2000):
+                    word = f"w{(i + offset) % 50}"
+                    self.assertEqual(t.translate_batch([word], "en", "es"), [word.upper()])
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        # A tiny cache makes evictions race with lookups
+        with mock.patch.object(translator, "TRANSLATION_CACHE_SIZE", 4):
+            threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(t._cache), 4)
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        t = self.make_translator()
+        with mock.patch.object(translator, "TRANSLATION_CACHE_SIZE", 2):
+            t.translate("a", "en", "es")
+            t.translate("b", "en", "es")
+            t.translate("a", "en", "es")
+            t.translate("c", "en", "es")
+        self.assertEqual([key[0] for key in t._cache], ["a", "c"])
+
+
+class ClientSetupTest(unittest.TestCase):
+    def test_concurrent_first_use_waits_for_the_client(self) -> None:
+        class SlowTranslator(_FakeClient):
+            def __init__(self, service_urls) -> None:
+                # Widen the window in which other threads reach _client()
+                time.sleep(0.2)
+
+        fake = types.ModuleType("googletrans")
+        fake.Translator = SlowTranslator
+        t = GoogleTranslator()
+        results = {}
+
+        def work(n: int) -> None:
+            results[n] = t.translate_batch([f"w{n}"], "en", "es")
+
+        with mock.patch.dict(sys.modules, {"googletrans": fake}):
+            threads = [threading.Thread(target=work, args=(n,)) for n in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results, {n: [f"W{n}"] for n in range(3)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,16 +13,12 @@ subclass `BaseTranslator` or replace the `GoogleTranslator` entirely.
 
 from __future__ import annotations
 
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
 
-try:
-    # googletrans can occasionally be flaky. It depends on an active
-    # internet connection and may require a newer version for best
-    # results. We guard the import so that the application does not
-    # crash if the library is absent.
-    from googletrans import Translator as _GoogleTranslator
-except Exception:
-    _GoogleTranslator = None  # type: ignore
+# Number of translations remembered by each GoogleTranslator
+TRANSLATION_CACHE_SIZE = 4096
 
 
 class BaseTranslator:
@@ -31,23 +27,65 @@ class BaseTranslator:
     def translate(self, text: str, src: str, dest: str) -> Optional[str]:
         raise NotImplementedError
 
+    def translate_batch(
+        self, texts: Sequence[str], src: str, dest: str
+    ) -> List[Optional[str]]:
+        """Translate several texts, returning one result per input.
+
+        The default implementation calls ``translate`` for each text.
+        Subclasses backed by a service with a multi-item request should
+        override it.
+        """
+        return [self.translate(text, src, dest) for text in texts]
+
 
 class GoogleTranslator(BaseTranslator):
     """Translation implementation backed by googletrans.
 
+    The googletrans import and client are created on first use, so
+    programs that never translate do not pay for loading the library and
+    its HTTP stack.
+
     Attributes:
-        _translator: The underlying googletrans client or None.
+        _translator: The underlying googletrans client, or None if it is
+            unavailable or not created yet.
+        _cache: Recent translations keyed by (text, src, dest), oldest first.
     """
 
     def __init__(self) -> None:
-        if _GoogleTranslator is not None:
-            try:
-                # Use service_urls to explicitly point to default google domain.
-                self._translator = _GoogleTranslator(service_urls=["translate.googleapis.com"])
-            except Exception:
-                self._translator = None
-        else:
-            self._translator = None
+        # Vocabulary lists repeat common words, so successful translations
+        # are remembered. Failures are not, so they are retried next time.
+        self._cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        # The translator is shared between request threads
+        self._cache_lock = threading.Lock()
+        # Held while the client is created so concurrent first calls wait
+        # for it instead of seeing a half-initialised translator
+        self._client_lock = threading.Lock()
+        self._translator: Any = None
+        self._loaded = False
+
+    def _client(self) -> Any:
+        """Return the googletrans client, creating it on first call."""
+        if self._loaded:
+            return self._translator
+        with self._client_lock:
+            if not self._loaded:
+                try:
+                    # googletrans can occasionally be flaky. It depends on an
+                    # active internet connection and may require a newer version
+                    # for best results. We guard the import so that the
+                    # application does not crash if the library is absent.
+                    from googletrans import Translator
+
+                    # Use service_urls to explicitly point to default google domain.
+                    self._translator = Translator(
+                        service_urls=["translate.googleapis.com"]
+                    )
+                except Exception:
+                    self._translator = None
+                # Only set once _translator holds its final value
+                self._loaded = True
+        return self._translator
 
     def translate(self, text: str, src: str, dest: str) -> Optional[str]:
         """Translate text from src language to dest language.
@@ -60,13 +98,76 @@ class GoogleTranslator(BaseTranslator):
         Returns:
             The translated string, or None if translation fails.
         """
-        if not text or not self._translator:
+        if not text:
+            return None
+        key = (text, src, dest)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        client = self._client()
+        if client is None:
             return None
         try:
-            result = self._translator.translate(text, src=src, dest=dest)
-            return result.text
+            result = client.translate(text, src=src, dest=dest)
         except Exception:
             return None
+        self._cache_put(key, result.text)
+        return result.text
+
+    def translate_batch(
+        self, texts: Sequence[str], src: str, dest: str
+    ) -> List[Optional[str]]:
+        """Translate several texts with a single request.
+
+        googletrans accepts a list and translates all items in one call.
+        If the batch request fails, each text is retried on its own so a
+        single bad item does not lose the whole batch.
+
+        Args:
+            texts: The input strings to translate.
+            src: Source language code (e.g. 'en').
+            dest: Target language code (e.g. 'es').
+
+        Returns:
+            The translations in input order, with None for failures.
+        """
+        out: List[Optional[str]] = [self._cache_get((t, src, dest)) if t else None for t in texts]
+        # Only texts that are not cached are sent to the service
+        missing = [i for i, text in enumerate(texts) if text and out[i] is None]
+        if not missing:
+            return out
+        client = self._client()
+        if client is None:
+            return out
+        try:
+            results = client.translate(
+                [texts[i] for i in missing], src=src, dest=dest
+            )
+        except Exception:
+            for i in missing:
+                out[i] = self.translate(texts[i], src, dest)
+            return out
+        for i, result in zip(missing, results):
+            if result is not None:
+                out[i] = result.text
+                self._cache_put((texts[i], src, dest), result.text)
+        return out
+
+    def _cache_get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: Tuple[str, str, str], value: Optional[str]) -> None:
+        if not value:
+            return
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > TRANSLATION_CACHE_SIZE:
+                self._cache.popitem(last=False)
 
 
 def get_default_translator() -> BaseTranslator:
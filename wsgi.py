@@ -0,0 +1,40 @@
+"""WSGI entry point for production servers.
+
+Exposes ``application`` for gunicorn, waitress or any other WSGI server.
+Run from the root of the checkout, whatever its directory is called::
+
+    gunicorn -w 4 --threads 4 -k gthread wsgi:application
+    waitress-serve --threads=8 wsgi:application
+
+It can also be imported as ``glosprogram.wsgi:application`` from the
+directory containing the ``glosprogram`` package.
+
+The database path can be set with the `GLOSPROGRAM_DB` environment
+variable. Every worker process opens its own connections to it.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+
+if __package__:
+    from .app import create_app
+else:
+    # Imported as a top-level module from the checkout root. The modules
+    # use relative imports, so load the checkout as the `glosprogram`
+    # package first; this works whatever the checkout directory is named.
+    _root = os.path.dirname(os.path.abspath(__file__))
+    if "glosprogram" not in sys.modules:
+        _spec = importlib.util.spec_from_file_location(
+            "glosprogram",
+            os.path.join(_root, "__init__.py"),
+            submodule_search_locations=[_root],
+        )
+        _package = importlib.util.module_from_spec(_spec)
+        sys.modules["glosprogram"] = _package
+        _spec.loader.exec_module(_package)
+    from glosprogram.app import create_app
+
+application = create_app(os.environ.get("GLOSPROGRAM_DB", "glosprogram.db"))